@@ -0,0 +1,134 @@
+import argparse
+import contextlib
+import io
+import time
+from typing import List, Tuple
+
+from compiler.opcodes_compiler import OPCodesCompiler, ParserType
+from utils.files import read_all_text
+from vm.opcodes.array_program import ArrayProgram
+from vm.opcodes.opcodes import OPCode
+from vm.runtime.value import Value, NumberValue
+from vm.vm import VirtualMachine, ExecutionEngineType
+
+BENCHMARK_PROGRAM = '''
+function add(a, b)
+    return a + b
+end
+
+function work(n)
+    local acc = 0
+    local flag = false
+
+    for i = 1, n do
+        acc = acc + add(i, 2) * 2
+        flag = acc > i and not flag
+    end
+
+    return acc
+end
+
+print(work(20000))
+'''
+
+BENCHMARK_CONFIGURATIONS = [
+    ("interpreter", dict(engine_type=ExecutionEngineType.INTERPRETER)),
+    ("closures", dict(engine_type=ExecutionEngineType.CLOSURES)),
+    ("interpreter + jit", dict(engine_type=ExecutionEngineType.INTERPRETER, enable_jit=True)),
+    ("closures + jit", dict(engine_type=ExecutionEngineType.CLOSURES, enable_jit=True)),
+    ("closures + unboxed", dict(engine_type=ExecutionEngineType.CLOSURES, unboxed_values=True)),
+    ("interpreter + arrays", dict(engine_type=ExecutionEngineType.INTERPRETER, array_program=True)),
+]
+
+
+# Counts instances of the runtime values created while it is active
+class AllocationsCounter:
+    def __init__(self):
+        self._allocations_count = 0
+
+    @property
+    def allocations_count(self) -> int:
+        return self._allocations_count
+
+    @contextlib.contextmanager
+    def track(self):
+        original_initializers = {}
+
+        # Inherited initializers are already counted by the class defining them, so every instance is counted once
+        for value_class in self._get_value_classes():
+            initializer = value_class.__dict__.get("__init__")
+
+            if initializer is not None or value_class is Value:
+                original_initializers[value_class] = initializer
+                value_class.__init__ = self._create_counting_initializer(value_class.__init__)
+
+        try:
+            yield self
+        finally:
+            for value_class, initializer in original_initializers.items():
+                if initializer is None:
+                    del value_class.__init__
+                else:
+                    value_class.__init__ = initializer
+
+    def _create_counting_initializer(self, initializer):
+        def counting_initializer(value, *args):
+            self._allocations_count += 1
+            initializer(value, *args)
+
+        return counting_initializer
+
+    @staticmethod
+    def _get_value_classes() -> List[type]:
+        value_classes = []
+        pending_classes = [Value]
+
+        while pending_classes:
+            value_class = pending_classes.pop()
+            value_classes.append(value_class)
+            pending_classes.extend(value_class.__subclasses__())
+
+        return value_classes
+
+
+def run_benchmark(bytecode: List[OPCode], array_program: bool = False, **vm_options) -> Tuple[float, int]:
+    program = ArrayProgram.from_opcodes(bytecode) if array_program else bytecode
+
+    virtual_machine = VirtualMachine(program, **vm_options)
+    virtual_machine.load_standard_library()
+
+    counter = AllocationsCounter()
+
+    with counter.track(), contextlib.redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        virtual_machine.run()
+        elapsed_time = time.perf_counter() - start_time
+
+    return elapsed_time, counter.allocations_count
+
+
+def print_benchmark_report(bytecode: List[OPCode]):
+    print("{:<20} {:>10} {:>14}".format("configuration", "time, s", "allocations"))
+
+    for name, vm_options in BENCHMARK_CONFIGURATIONS:
+        elapsed_time, allocations_count = run_benchmark(bytecode, **vm_options)
+
+        print("{:<20} {:>10.3f} {:>14}".format(name, elapsed_time, allocations_count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures execution time and values allocations of the program")
+    parser.add_argument("source", nargs="?", help="path to the lua source (builtin program is used by default)")
+    parser.add_argument("--cache-numbers", action="store_true", help="share instances of the small integral numbers")
+    args = parser.parse_args()
+
+    program_text = read_all_text(args.source) if args.source else BENCHMARK_PROGRAM
+
+    if args.cache_numbers:
+        NumberValue.enable_cache()
+
+    print_benchmark_report(OPCodesCompiler.compile(program_text, parser_type=ParserType.FAST))
+
+
+if __name__ == '__main__':
+    main()
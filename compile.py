@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+from typing import List, Tuple
+
+from compiler.ast.inliner import DEFAULT_INLINING_BUDGET
+from compiler.batch import BatchCompiler
+from compiler.opcodes_compiler import ParserType
+
+SOURCE_FILE_EXTENSION = ".lua"
+BYTECODE_FILE_EXTENSION = ".luab"
+
+
+def collect_sources(paths: List[str]) -> List[Tuple[str, str]]:
+    # Returns paths of the sources together with their paths relative to the output directory
+    sources = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            for directory_path, _, file_names in os.walk(path):
+                for file_name in sorted(file_names):
+                    if file_name.endswith(SOURCE_FILE_EXTENSION):
+                        source_path = os.path.join(directory_path, file_name)
+                        sources.append((source_path, os.path.relpath(source_path, path)))
+        else:
+            sources.append((path, os.path.basename(path)))
+
+    return sources
+
+
+def get_bytecode_path(output_directory: str, relative_source_path: str) -> str:
+    base_path, _ = os.path.splitext(relative_source_path)
+
+    return os.path.join(output_directory, base_path + BYTECODE_FILE_EXTENSION)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiles lua sources to the binary bytecode in parallel")
+    parser.add_argument("sources", nargs="+", help="source files or directories searched for *.lua files")
+    parser.add_argument("-o", "--output", default=".", help="directory for the compiled files")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (all cores by default)")
+    parser.add_argument("--parser", choices=[parser_type.name.lower() for parser_type in ParserType],
+                        default=ParserType.ANTLR.name.lower(), help="front end used to parse the sources")
+    parser.add_argument("--no-optimize", action="store_true", help="disable the compiler optimizations")
+    parser.add_argument("--cache", default=None, help="directory of the compiled bytecode cache")
+    parser.add_argument("--inline", type=int, nargs="?", const=DEFAULT_INLINING_BUDGET, default=0,
+                        metavar="BUDGET", help="inline calls of the small functions up to the given size")
+    args = parser.parse_args()
+
+    sources = collect_sources(args.sources)
+    compiler = BatchCompiler(args.jobs, not args.no_optimize, ParserType[args.parser.upper()], args.cache,
+                             args.inline)
+
+    failed_count = 0
+
+    for (source_path, relative_source_path), result in zip(sources, compiler.compile_files(
+            [source_path for source_path, _ in sources])):
+        if not result.succeeded:
+            failed_count += 1
+            print("{}: {}".format(source_path, result.error), file=sys.stderr)
+            continue
+
+        bytecode_path = get_bytecode_path(args.output, relative_source_path)
+        os.makedirs(os.path.dirname(bytecode_path) or ".", exist_ok=True)
+
+        with open(bytecode_path, "wb") as bytecode_file:
+            bytecode_file.write(result.bytecode)
+
+    print("Compiled {} of {} files".format(len(sources) - failed_count, len(sources)))
+
+    if failed_count:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import time
+import tracemalloc
+from typing import Tuple
+
+from compiler.opcodes_compiler import OPCodesCompiler, ParserType
+from utils.files import read_all_text
+
+GENERATED_FUNCTION_TEMPLATE = '''
+function compute_{index}(a, b)
+    local result = a * {index} + b / 2
+
+    if result > {index} and not (a == b) then
+        result = result - a .. "suffix"
+    elseif result <= 0 then
+        result = 0
+    else
+        result = result + 1
+    end
+
+    for i = 1, b, 2 do
+        result = result + compute_helper(i, a)
+    end
+
+    return result
+end
+'''
+
+
+def generate_program(functions_count: int) -> str:
+    functions = [GENERATED_FUNCTION_TEMPLATE.format(index=index) for index in range(functions_count)]
+    calls = ["print(compute_{}({}, 2))\n".format(index, index) for index in range(functions_count)]
+
+    return "".join(functions) + "".join(calls)
+
+
+def measure_compilation(program_text: str, parser_type: ParserType) -> Tuple[float, int]:
+    # Returns compilation time and peak memory allocated while compiling, memory is measured by the separate run,
+    # since tracing of the allocations slows down the compilation
+    start_time = time.perf_counter()
+    OPCodesCompiler.compile(program_text, parser_type=parser_type)
+    elapsed_time = time.perf_counter() - start_time
+
+    tracemalloc.start()
+
+    try:
+        OPCodesCompiler.compile(program_text, parser_type=parser_type)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return elapsed_time, peak_memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures compilation time and peak memory of the front ends")
+    parser.add_argument("source", nargs="?", help="path to the lua source (generated program is used by default)")
+    parser.add_argument("--functions", type=int, default=1000, help="number of functions in the generated program")
+    args = parser.parse_args()
+
+    program_text = read_all_text(args.source) if args.source else generate_program(args.functions)
+
+    print("Program size: {} bytes".format(len(program_text)))
+    print("{:<16} {:>10} {:>16}".format("parser", "time, s", "peak memory, MB"))
+
+    for parser_type in ParserType:
+        try:
+            elapsed_time, peak_memory = measure_compilation(program_text, parser_type)
+        except ImportError as error:
+            print("{:<16} unavailable ({})".format(parser_type.name.lower(), error))
+            continue
+
+        print("{:<16} {:>10.3f} {:>16.2f}".format(parser_type.name.lower(), elapsed_time, peak_memory / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
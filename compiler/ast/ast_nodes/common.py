@@ -4,6 +4,7 @@ from typing import Optional, Tuple, Union
 from compiler.ast.ast_nodes.node import ASTNode
 from compiler.opcodes.context import OPCodesCompilationContext
 from vm.opcodes.opcodes import OPCode, OPCodeType
+from vm.runtime.value import Value, NumberValue, StringValue, BooleanValue
 
 
 class LiteralType(Enum):
@@ -50,6 +51,29 @@ class LiteralNode(ASTNode):
 
         return value
 
+    @property
+    def constant_value(self) -> Optional[Value]:
+        # Runtime value of the literal, used for the constants folding (None if the literal is not foldable)
+        if self._type == LiteralType.NUMBER:
+            return NumberValue(float(self._value))
+        elif self._type == LiteralType.STRING and self._value.startswith('"'):
+            return StringValue(self._value[1:-1])
+        elif self._type == LiteralType.BOOLEAN:
+            return BooleanValue.of(self._value)
+
+        return None
+
+    @staticmethod
+    def from_constant_value(value) -> Optional["LiteralNode"]:
+        if isinstance(value, NumberValue):
+            return LiteralNode(LiteralType.NUMBER, value.value)
+        elif isinstance(value, StringValue):
+            return LiteralNode(LiteralType.STRING, '"{}"'.format(value.value))
+        elif isinstance(value, BooleanValue):
+            return LiteralNode(LiteralType.BOOLEAN, value.value)
+
+        return None
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
         context.add_opcode(OPCode(OPCodeType.PUSH, [self.value_representation]))
 
@@ -86,7 +110,10 @@ class ValueName(ASTNode):
             return "ValueName(\"{}\")".format(self.full_name)
 
     def generate_opcodes(self, context: OPCodesCompilationContext):
-        context.add_opcode(OPCode(OPCodeType.PUSH, [self.full_name]))
+        if self.is_class_value:
+            context.add_opcode(OPCode(OPCodeType.PUSH, [self.full_name]))
+        else:
+            context.add_load_variable(self.full_name)
 
 
 class FunctionParameter:
@@ -1,9 +1,10 @@
 from enum import Enum, auto
-from typing import List
+from typing import List, Callable, Optional
 
 from compiler.ast.ast_nodes.common import LiteralNode, ValueName
 from compiler.ast.ast_nodes.expression import ExpressionNode
 from compiler.opcodes.context import OPCodesCompilationContext
+from vm.exceptions.common import VirtualMachineInvalidOperationError
 from vm.opcodes.opcodes import OPCode, OPCodeType
 
 
@@ -47,6 +48,37 @@ class BinaryExpressionType(Enum):
     CONCAT = auto()
 
 
+# Operations are folded by the runtime values, so the folded result is the same as the computed one
+_CONSTANT_BINARY_OPERATIONS = {
+    BinaryExpressionType.ADD: lambda left, right: left + right,
+    BinaryExpressionType.SUBTRACT: lambda left, right: left - right,
+    BinaryExpressionType.MULTIPLY: lambda left, right: left * right,
+    BinaryExpressionType.DIVIDE: lambda left, right: left / right,
+    BinaryExpressionType.BOOLEAN_AND: lambda left, right: left.boolean_and(right),
+    BinaryExpressionType.BOOLEAN_OR: lambda left, right: left.boolean_or(right),
+    BinaryExpressionType.CMP_EQ: lambda left, right: left.__eq__(right),
+    BinaryExpressionType.CMP_NE: lambda left, right: left.__ne__(right),
+    BinaryExpressionType.CMP_LT: lambda left, right: left.__lt__(right),
+    BinaryExpressionType.CMP_GT: lambda left, right: left.__gt__(right),
+    BinaryExpressionType.CMP_LE: lambda left, right: left.__le__(right),
+    BinaryExpressionType.CMP_GE: lambda left, right: left.__ge__(right),
+    BinaryExpressionType.CONCAT: lambda left, right: left.concat(right),
+}
+
+
+def _fold_constant(operation: Callable, *operands: ExpressionNode) -> Optional[LiteralNode]:
+    values = [operand.constant_value if isinstance(operand, LiteralNode) else None for operand in operands]
+
+    if any(value is None for value in values):
+        return None
+
+    try:
+        return LiteralNode.from_constant_value(operation(*values))
+    except (VirtualMachineInvalidOperationError, ArithmeticError):
+        # Invalid operations are kept, so they fail at runtime as usual
+        return None
+
+
 class BinaryOperationExpression(ExpressionNode):
     _printable_fields = ["_left", "_expression_type", "_right"]
 
@@ -56,6 +88,13 @@ class BinaryOperationExpression(ExpressionNode):
         self._right = right
         self._expression_type = expression_type
 
+    def optimize(self) -> ExpressionNode:
+        super().optimize()
+
+        folded_literal = _fold_constant(_CONSTANT_BINARY_OPERATIONS[self._expression_type], self._left, self._right)
+
+        return self if folded_literal is None else folded_literal
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
         self._left.generate_opcodes(context)
         self._right.generate_opcodes(context)
@@ -103,6 +142,16 @@ class UnaryOperationExpression(ExpressionNode):
         self._right = right
         self._expression_type = expression_type
 
+    def optimize(self) -> ExpressionNode:
+        super().optimize()
+
+        if self._expression_type == UnaryExpressionType.MINUS:
+            folded_literal = _fold_constant(lambda value: -value, self._right)
+        else:
+            folded_literal = _fold_constant(lambda value: value.boolean_not(), self._right)
+
+        return self if folded_literal is None else folded_literal
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
         self._right.generate_opcodes(context)
 
@@ -123,7 +172,31 @@ class FunctionCallExpression(ExpressionNode):
         self._args = args
         self._is_orphan = is_orphan
 
+    @property
+    def callable(self) -> ExpressionNode:
+        return self._callable
+
+    @property
+    def args(self) -> ExpressionsTuple:
+        return self._args
+
+    @property
+    def is_orphan(self) -> bool:
+        return self._is_orphan
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
+        # Results of the call statement are not used, so the call does not leave them on the stack at all
+        self.generate_call_opcodes(context, 0 if self._is_orphan else 1)
+
+    def generate_call_opcodes(self, context: OPCodesCompilationContext, results_count: int):
+        self._generate_callable_opcodes(context)
+        context.add_opcode(OPCode(OPCodeType.CALL, [len(self._args.expressions), results_count]))
+
+    def generate_tail_call_opcodes(self, context: OPCodesCompilationContext):
+        self._generate_callable_opcodes(context)
+        context.add_opcode(OPCode(OPCodeType.TAILCALL, [len(self._args.expressions)]))
+
+    def _generate_callable_opcodes(self, context: OPCodesCompilationContext):
         for expression in self._args.expressions:
             expression.generate_opcodes(context)
 
@@ -134,11 +207,6 @@ class FunctionCallExpression(ExpressionNode):
         else:
             raise NotImplementedError
 
-        context.add_opcode(OPCode(OPCodeType.CALL, [len(self._args.expressions)]))
-
-        if self._is_orphan:
-            context.add_opcode(OPCode(OPCodeType.POP))
-
 
 class ValueExpression(ExpressionNode):
     _printable_fields = ["_value_name"]
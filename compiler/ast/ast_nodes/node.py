@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from compiler.opcodes.context import OPCodesCompilationContext
 
 
@@ -7,5 +9,27 @@ class ASTNode:
     def __init__(self):
         pass
 
+    def get_children(self) -> List["ASTNode"]:
+        children = []
+
+        for value in vars(self).values():
+            if isinstance(value, ASTNode):
+                children.append(value)
+            elif isinstance(value, (list, tuple)):
+                children.extend(item for item in value if isinstance(item, ASTNode))
+
+        return children
+
+    def optimize(self) -> Optional["ASTNode"]:
+        # Simplifies the subtree and returns the node replacing this one or None if the node should be dropped
+        for name, value in list(vars(self).items()):
+            if isinstance(value, ASTNode):
+                setattr(self, name, value.optimize())
+            elif isinstance(value, list):
+                optimized_items = (item.optimize() if isinstance(item, ASTNode) else item for item in value)
+                setattr(self, name, [item for item in optimized_items if item is not None])
+
+        return self
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
         raise NotImplementedError
@@ -28,5 +28,9 @@ class Script(ASTNode):
         super().__init__()
         self._statements_block = statements_block
 
+    @property
+    def statements_block(self) -> StatementsBlock:
+        return self._statements_block
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
         self._statements_block.generate_opcodes(context)
@@ -1,13 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Set
 
-from compiler.ast.ast_nodes.common import ValueName, FunctionParameter, LiteralType
+from compiler.ast.ast_nodes.common import ValueName, FunctionParameter, LiteralType, LiteralNode
 from compiler.ast.ast_nodes.expression import ExpressionNode
-from compiler.ast.ast_nodes.expressions import ExpressionsTuple, ValueExpression
+from compiler.ast.ast_nodes.expressions import ExpressionsTuple, ValueExpression, FunctionCallExpression
 from compiler.ast.ast_nodes.script import StatementsBlock
 from compiler.ast.ast_nodes.statement import StatementNode
 from compiler.exceptions.common import OPCodesCompilationError
 from compiler.opcodes.context import OPCodesCompilationContext
 from vm.opcodes.opcodes import OPCode, OPCodeType
+from vm.runtime.loops import LOOP_SLOTS_COUNT
 
 
 class AssignmentStatement(StatementNode):
@@ -19,21 +20,14 @@ class AssignmentStatement(StatementNode):
         self._rvalue_tuple = rvalue_tuple
         self._local = local
 
-    def generate_opcodes(self, context: OPCodesCompilationContext):
-        if self._local:
-            for expression in self._lvalue_tuple.expressions:
-                if not isinstance(expression, ValueExpression):
-                    raise OPCodesCompilationError("Left value tuple should contain only assignable value expressions")
-
-                value_name = expression.value_name
-                assert not value_name.is_class_value
-
-                context.add_opcode(OPCode(OPCodeType.DECLARE_LOCAL, [value_name.name.value_representation]))
+    @property
+    def lvalue_tuple(self) -> ExpressionsTuple:
+        return self._lvalue_tuple
 
-        for expression in self._rvalue_tuple.expressions:
-            expression.generate_opcodes(context)
+    def generate_opcodes(self, context: OPCodesCompilationContext):
+        lvalue_names = []
 
-        for expression in reversed(self._lvalue_tuple.expressions):
+        for expression in self._lvalue_tuple.expressions:
             if not isinstance(expression, ValueExpression):
                 raise OPCodesCompilationError("Left value tuple should contain only assignable value expressions")
 
@@ -43,7 +37,42 @@ class AssignmentStatement(StatementNode):
             if value_name.name.type != LiteralType.IDENTIFIER:
                 raise OPCodesCompilationError("Left value tuple subexpressions should be identifiers")
 
-            context.add_opcode(OPCode(OPCodeType.ASSIGN, [value_name.name.value_representation]))
+            lvalue_names.append(value_name.name.value_representation)
+
+        rvalue_expressions = self._rvalue_tuple.expressions
+
+        for expression in rvalue_expressions[:-1]:
+            expression.generate_opcodes(context)
+
+        if rvalue_expressions:
+            last_expression = rvalue_expressions[-1]
+            missing_values_count = len(lvalue_names) - len(rvalue_expressions)
+
+            # Call in the last position provides all the values missing for the left side
+            if isinstance(last_expression, FunctionCallExpression):
+                results_count = max(missing_values_count + 1, 0)
+                last_expression.generate_call_opcodes(context, results_count)
+                missing_values_count += 1 - results_count
+            else:
+                last_expression.generate_opcodes(context)
+        else:
+            missing_values_count = len(lvalue_names)
+
+        # Values are adjusted to the number of names, surplus ones are dropped and missing ones are nil
+        for _ in range(missing_values_count):
+            context.add_opcode(OPCode(OPCodeType.PUSH, ["nil"]))
+
+        for _ in range(-missing_values_count):
+            context.add_opcode(OPCode(OPCodeType.POP))
+
+        # Locals become visible only after the right values are evaluated
+        if self._local:
+            for name in lvalue_names:
+                if context.declare_local(name) is None:
+                    context.add_opcode(OPCode(OPCodeType.DECLARE_LOCAL, [name]))
+
+        for name in reversed(lvalue_names):
+            context.add_store_variable(name)
 
 
 class FunctionDeclarationStatement(StatementNode):
@@ -55,12 +84,32 @@ class FunctionDeclarationStatement(StatementNode):
         self._parameters = parameters
         self._statements_block = statements
 
+    @property
+    def name(self) -> ValueName:
+        return self._name
+
+    @property
+    def parameters(self) -> List[ValueName]:
+        return self._parameters
+
+    @property
+    def statements_block(self) -> StatementsBlock:
+        return self._statements_block
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
-        context.add_opcode(OPCode(OPCodeType.FUNCTION, [self._name.full_name]))
+        context.add_opcode(OPCode(OPCodeType.FUNCTION, [self._name.full_name, 0, len(self._parameters)]))
+        function_opcode = context.current_opcode
+
         context.add_opcode(OPCode(OPCodeType.BEGIN_SCOPE))
+        context.enter_function(self._get_captured_names())
 
         for parameter_name in reversed(self._parameters):
-            context.add_opcode(OPCode(OPCodeType.ASSIGN, [parameter_name.full_name]))
+            slot = context.declare_local(parameter_name.full_name)
+
+            if slot is None:
+                context.add_opcode(OPCode(OPCodeType.ASSIGN, [parameter_name.full_name]))
+            else:
+                context.add_opcode(OPCode(OPCodeType.STORE_LOCAL, [slot]))
 
         self._statements_block.generate_opcodes(context)
 
@@ -75,8 +124,37 @@ class FunctionDeclarationStatement(StatementNode):
             context.add_opcode(OPCode(OPCodeType.PUSH, ["nil"]))
             context.add_opcode(OPCode(OPCodeType.RETURN, [1]))
 
+        function_opcode.args[1] = context.exit_function()
         context.add_opcode(OPCode(OPCodeType.END_SCOPE))
 
+    def _get_captured_names(self) -> Set[str]:
+        captured_names = set()
+        nodes = list(self._statements_block.get_children())
+
+        while nodes:
+            node = nodes.pop()
+
+            if isinstance(node, FunctionDeclarationStatement):
+                captured_names.update(node._get_used_names())
+            else:
+                nodes.extend(node.get_children())
+
+        return captured_names
+
+    def _get_used_names(self) -> Set[str]:
+        used_names = set()
+        nodes = [self]
+
+        while nodes:
+            node = nodes.pop()
+
+            if isinstance(node, ValueName):
+                used_names.add(node.full_name)
+            else:
+                nodes.extend(node.get_children())
+
+        return used_names
+
 
 class ReturnStatement(StatementNode):
     _printable_fields = ["_rvalue_tuple"]
@@ -85,11 +163,22 @@ class ReturnStatement(StatementNode):
         super().__init__()
         self._rvalue_tuple = rvalue_tuple
 
+    @property
+    def rvalue_tuple(self) -> ExpressionsTuple:
+        return self._rvalue_tuple
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
-        for expression in self._rvalue_tuple.expressions:
+        expressions = self._rvalue_tuple.expressions
+
+        # Call in the tail position replaces the current function, so its frame is not kept during the call
+        if context.in_function and len(expressions) == 1 and isinstance(expressions[0], FunctionCallExpression):
+            expressions[0].generate_tail_call_opcodes(context)
+            return
+
+        for expression in expressions:
             expression.generate_opcodes(context)
 
-        context.add_opcode(OPCode(OPCodeType.RETURN, [len(self._rvalue_tuple.expressions)]))
+        context.add_opcode(OPCode(OPCodeType.RETURN, [len(expressions)]))
 
 
 class BreakStatement(StatementNode):
@@ -121,33 +210,64 @@ class ConditionalStatement(StatementNode):
         self._branches = branches
         self._else_statements = else_statements
 
+    def optimize(self) -> Optional[StatementNode]:
+        super().optimize()
+
+        branches = []
+
+        for branch in self._branches:
+            condition = branch.condition
+
+            if isinstance(condition, LiteralNode) and condition.type == LiteralType.BOOLEAN:
+                if condition.value:
+                    # Branch is always taken, so the rest of branches are unreachable
+                    self._else_statements = branch.then_statements
+                    break
+            else:
+                branches.append(branch)
+
+        self._branches = branches
+
+        if not self._branches and self._else_statements is None:
+            return None
+
+        return self
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
         branches_addresses = []
         jump_next_branch_opcodes = []
         jump_complete_opcodes = []
 
+        # Condition is evaluated outside of the branch scope and jumps never leave the scope,
+        # so every executed 'begin_scope' is matched by the executed 'end_scope'
         for branch in self._branches:
-            context.add_opcode(OPCode(OPCodeType.BEGIN_SCOPE))
             branch.condition.generate_opcodes(context)
 
-            context.add_opcode(OPCode(OPCodeType.JUMP_NEG, [-1]))
+            context.add_conditional_jump(OPCodeType.JUMP_NEG, -1)
             jump_next_branch_opcodes.append(context.current_opcode)
 
             branches_addresses.append(context.current_address + 1)
 
+            context.add_opcode(OPCode(OPCodeType.BEGIN_SCOPE))
+            context.enter_block()
+
             branch.then_statements.generate_opcodes(context)
 
+            context.exit_block()
+            context.add_opcode(OPCode(OPCodeType.END_SCOPE))
+
             context.add_opcode(OPCode(OPCodeType.JUMP, [-1]))
             jump_complete_opcodes.append(context.current_opcode)
 
-            context.add_opcode(OPCode(OPCodeType.END_SCOPE))
-
         if self._else_statements is not None:
-            context.add_opcode(OPCode(OPCodeType.BEGIN_SCOPE))
             branches_addresses.append(context.current_address + 1)
 
+            context.add_opcode(OPCode(OPCodeType.BEGIN_SCOPE))
+            context.enter_block()
+
             self._else_statements.generate_opcodes(context)
 
+            context.exit_block()
             context.add_opcode(OPCode(OPCodeType.END_SCOPE))
 
         # Conditional statement end address
@@ -173,34 +293,41 @@ class ForLoopStatement(StatementNode):
         self._step_expression = step_expression
         self._statements_block = statements_block
 
+    @property
+    def counter_name(self) -> ValueName:
+        return self._counter_name
+
     def generate_opcodes(self, context: OPCodesCompilationContext):
+        counter_name = self._counter_name.full_name
+
         context.add_opcode(OPCode(OPCodeType.BEGIN_SCOPE))
+        context.enter_block()
 
+        # Start, limit and step are evaluated once and kept in the hidden frame slots during the loop
         self._start_expression.generate_opcodes(context)
-        context.add_opcode(OPCode(OPCodeType.ASSIGN, [self._counter_name.full_name]))
-
-        loop_iteration_address = context.current_address + 1
-
-        context.add_opcode(OPCode(OPCodeType.PUSH, [self._counter_name.full_name]))
         self._end_expression.generate_opcodes(context)
 
-        context.add_opcode(OPCode(OPCodeType.CMP_GT))
-        context.add_opcode(OPCode(OPCodeType.JUMP_POS, [-1]))
-
-        jump_to_loop_end_opcode = context.current_opcode
-
-        self._statements_block.generate_opcodes(context)
-
         if self._step_expression is not None:
             self._step_expression.generate_opcodes(context)
         else:
             context.add_opcode(OPCode(OPCodeType.PUSH, ['1']))
 
-        context.add_opcode(OPCode(OPCodeType.PUSH, [self._counter_name.full_name]))
-        context.add_opcode(OPCode(OPCodeType.SUM))
-        context.add_opcode(OPCode(OPCodeType.ASSIGN, [self._counter_name.full_name]))
+        loop_slot = context.reserve_slots(LOOP_SLOTS_COUNT)
+
+        context.add_opcode(OPCode(OPCodeType.FORPREP, [loop_slot, -1]))
+        prepare_loop_opcode = context.current_opcode
+
+        if context.declare_local(counter_name) is None:
+            context.add_opcode(OPCode(OPCodeType.DECLARE_LOCAL, [counter_name]))
+
+        # Every iteration starts with the counter value pushed by 'forprep' or 'forloop'
+        loop_iteration_address = context.current_address + 1
+        context.add_store_variable(counter_name)
+
+        self._statements_block.generate_opcodes(context)
 
-        context.add_opcode(OPCode(OPCodeType.JUMP, [loop_iteration_address]))
+        context.add_opcode(OPCode(OPCodeType.FORLOOP, [loop_slot, loop_iteration_address]))
 
+        context.exit_block()
         context.add_opcode(OPCode(OPCodeType.END_SCOPE))
-        jump_to_loop_end_opcode.args[0] = context.current_address
+        prepare_loop_opcode.args[1] = context.current_address
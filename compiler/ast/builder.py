@@ -13,6 +13,8 @@ class Transformer(BaseNodeTransformer):
 
 
 class ASTBuilder:
+    _alias_nodes_bound = False
+
     def __init__(self, text: str):
         self._text = text
         self._parse_tree = parse_script(text)
@@ -21,6 +23,13 @@ class ASTBuilder:
     def get_tree(self) -> ASTNode:
         return self._ast
 
+    @classmethod
+    def _bind_alias_nodes(cls):
+        # Binding is global for the transformer class, so it is done once per process
+        if not cls._alias_nodes_bound:
+            Transformer.bind_alias_nodes(NodesTransformerContext.get_available_nodes())
+            cls._alias_nodes_bound = True
+
     def _create_ast_tree(self):
-        Transformer.bind_alias_nodes(NodesTransformerContext.get_available_nodes())
+        self._bind_alias_nodes()
         return process_tree(self._parse_tree, transformer_cls=Transformer).get_ast_node()
@@ -0,0 +1,447 @@
+import re
+from typing import List, Optional, Tuple
+
+from compiler.ast.ast_nodes.common import LiteralNode, LiteralType, ValueName
+from compiler.ast.ast_nodes.expression import ExpressionNode
+from compiler.ast.ast_nodes.expressions import ExpressionsTuple, ValueExpression, BinaryOperationExpression, \
+    BinaryExpressionType, UnaryOperationExpression, UnaryExpressionType, FunctionCallExpression
+from compiler.ast.ast_nodes.script import Script, StatementsBlock
+from compiler.ast.ast_nodes.statement import StatementNode
+from compiler.ast.ast_nodes.statements import AssignmentStatement, FunctionDeclarationStatement, ReturnStatement, \
+    BreakStatement, ConditionalStatement, ConditionalBranchStatement, ForLoopStatement
+from compiler.ast.parse_nodes.helpers import raw_value_name_to_ast_node
+from compiler.exceptions.common import CompilerError
+
+_KEYWORDS = {"and", "break", "do", "else", "elseif", "end", "false", "for", "function", "if", "in", "local", "nil",
+             "not", "or", "repeat", "return", "then", "true", "until", "while"}
+
+# Tokens are matched in the order of the grammar lexer rules, keywords are separated from the names afterwards
+_TOKENS_REGEX = re.compile(r'''
+    (?P<skip>[ \t\f\r\n]+|--[^\r\n]*)
+  | (?P<number>0x[0-9a-f]+|[0-9]+(?:\.[0-9]+)?[eE]-?[0-9]+|[0-9]+\.[0-9]+|[0-9]+)
+  | (?P<name>[a-zA-Z_][a-zA-Z_0-9]*)
+  | (?P<string>"(?:\\.|[^\\"])*"|'(?:\\.|[^\\'])*'|\[=*\[(?:\\.|[^\\\]])*\]=*\])
+  | (?P<operator>\.\.\.|\.\.|==|~=|<=|>=|<<|>>|//|[-+*/%\#&|~<>=(){}\[\];:,.])
+''', re.VERBOSE)
+
+_BINARY_OPERATORS = {
+    "or": (2, BinaryExpressionType.BOOLEAN_OR),
+    "and": (3, BinaryExpressionType.BOOLEAN_AND),
+    "<": (4, BinaryExpressionType.CMP_LT),
+    ">": (4, BinaryExpressionType.CMP_GT),
+    "<=": (4, BinaryExpressionType.CMP_LE),
+    ">=": (4, BinaryExpressionType.CMP_GE),
+    "~=": (4, BinaryExpressionType.CMP_NE),
+    "==": (4, BinaryExpressionType.CMP_EQ),
+    "..": (5, BinaryExpressionType.CONCAT),
+    "+": (6, BinaryExpressionType.ADD),
+    "-": (6, BinaryExpressionType.SUBTRACT),
+    "*": (7, BinaryExpressionType.MULTIPLY),
+    "/": (7, BinaryExpressionType.DIVIDE),
+}
+
+# Operators which are accepted by the grammar but have no AST representation yet
+_UNSUPPORTED_BINARY_OPERATORS = {"&": 1, "|": 1, "~": 1, "<<": 1, ">>": 1, "%": 7, "//": 7}
+
+_UNARY_OPERATORS = {
+    "-": UnaryExpressionType.MINUS,
+    "not": UnaryExpressionType.NOT,
+}
+
+_UNARY_PRECEDENCE = 8
+_CONCAT_PRECEDENCE = 5
+
+
+class Token:
+    __slots__ = ("kind", "text", "position")
+
+    def __init__(self, kind: str, text: str, position: int):
+        self.kind = kind
+        self.text = text
+        self.position = position
+
+    def __str__(self):
+        return "Token(kind={}, text={})".format(self.kind, self.text)
+
+
+def tokenize(text: str) -> List[Token]:
+    tokens = []
+    position = 0
+    text_length = len(text)
+
+    while position < text_length:
+        match = _TOKENS_REGEX.match(text, position)
+
+        if match is None:
+            raise CompilerError("Unexpected character '{}' at position {}".format(text[position], position))
+
+        kind = match.lastgroup
+        value = match.group(kind)
+
+        if kind == "name" and value in _KEYWORDS:
+            kind = "keyword"
+
+        if kind != "skip":
+            tokens.append(Token(kind, value, position))
+
+        position = match.end()
+
+    tokens.append(Token("eof", "", text_length))
+
+    return tokens
+
+
+# Recursive descent parser of the language defined in grammar/lua.g4 which builds the AST nodes directly
+# (expressions are parsed by precedence climbing), so it produces the same trees as ASTBuilder without
+# the ANTLR runtime and the intermediate parse nodes
+class FastParser:
+    def __init__(self, text: str):
+        self._tokens = tokenize(text)
+        self._position = 0
+
+    def parse(self) -> Script:
+        block = self._parse_block()
+
+        if self._current.kind != "eof":
+            self._raise_unexpected()
+
+        return Script(block)
+
+    @property
+    def _current(self) -> Token:
+        return self._tokens[self._position]
+
+    def _peek(self, offset: int = 1) -> Token:
+        return self._tokens[min(self._position + offset, len(self._tokens) - 1)]
+
+    def _check(self, text: str) -> bool:
+        token = self._current
+        return token.text == text and token.kind in ("keyword", "operator")
+
+    def _accept(self, text: str) -> bool:
+        if self._check(text):
+            self._position += 1
+            return True
+
+        return False
+
+    def _expect(self, text: str) -> Token:
+        if not self._check(text):
+            self._raise_unexpected(text)
+
+        token = self._current
+        self._position += 1
+
+        return token
+
+    def _expect_name(self) -> str:
+        token = self._current
+
+        if token.kind != "name":
+            self._raise_unexpected("name")
+
+        self._position += 1
+
+        return token.text
+
+    def _raise_unexpected(self, expected: Optional[str] = None):
+        token = self._current
+        found = "end of input" if token.kind == "eof" else "'{}'".format(token.text)
+
+        if expected is None:
+            raise CompilerError("Unexpected {} at position {}".format(found, token.position))
+
+        raise CompilerError("Expected '{}' but {} found at position {}".format(expected, found, token.position))
+
+    def _parse_block(self) -> StatementsBlock:
+        statements = []
+
+        while True:
+            if self._check("return") or self._check("break"):
+                statements.append(self._parse_block_end_statement())
+                self._accept(";")
+                break
+
+            statement = self._parse_statement()
+
+            if statement is None:
+                break
+
+            statements.append(statement)
+            self._accept(";")
+
+        return StatementsBlock(statements)
+
+    def _parse_block_end_statement(self) -> StatementNode:
+        if self._accept("break"):
+            return BreakStatement()
+
+        self._expect("return")
+
+        if self._is_block_end() or self._check(";"):
+            return ReturnStatement(ExpressionsTuple([]))
+
+        return ReturnStatement(self._parse_rvalue_handle())
+
+    def _is_block_end(self) -> bool:
+        token = self._current
+
+        if token.kind == "eof":
+            return True
+
+        return token.kind == "keyword" and token.text in ("end", "else", "elseif", "until")
+
+    def _parse_statement(self) -> Optional[StatementNode]:
+        token = self._current
+
+        if token.kind == "name":
+            return self._parse_name_statement()
+
+        if token.kind != "keyword":
+            return None
+
+        if token.text == "function":
+            return self._parse_function_declaration()
+        elif token.text == "local":
+            return self._parse_local_statement()
+        elif token.text == "if":
+            return self._parse_conditional_statement()
+        elif token.text == "for":
+            return self._parse_for_statement()
+        elif token.text in ("do", "while", "repeat"):
+            raise CompilerError("'{}' statement is not supported (position {})".format(token.text, token.position))
+
+        return None
+
+    def _parse_name_statement(self) -> StatementNode:
+        top_level_name, class_level_name = self._parse_value_name_parts()
+
+        if self._accept("("):
+            args = self._parse_call_arguments()
+
+            return FunctionCallExpression(
+                ValueExpression(raw_value_name_to_ast_node(top_level_name, class_level_name)), args, True)
+
+        lvalues = [ValueExpression(raw_value_name_to_ast_node(top_level_name, class_level_name))]
+
+        while self._accept(","):
+            lvalues.append(ValueExpression(self._parse_value_name()))
+
+        self._expect("=")
+
+        return AssignmentStatement(ExpressionsTuple(lvalues), self._parse_rvalue_handle(), False)
+
+    def _parse_value_name_parts(self) -> Tuple[str, Optional[str]]:
+        top_level_name = self._expect_name()
+        class_level_name = None
+
+        if self._check(":") and self._peek().kind == "name":
+            self._position += 1
+            class_level_name = self._expect_name()
+
+        return top_level_name, class_level_name
+
+    def _parse_value_name(self) -> ValueName:
+        return raw_value_name_to_ast_node(*self._parse_value_name_parts())
+
+    def _parse_function_declaration(self) -> StatementNode:
+        self._expect("function")
+
+        top_level_name = self._expect_name()
+        class_level_name = None
+
+        while self._accept("."):
+            class_level_name = self._expect_name()
+
+        if self._accept(":"):
+            class_level_name = self._expect_name()
+
+        parameters = self._parse_function_parameters()
+        body = self._parse_block()
+        self._expect("end")
+
+        return FunctionDeclarationStatement(raw_value_name_to_ast_node(top_level_name, class_level_name),
+                                            parameters, body)
+
+    def _parse_function_parameters(self) -> List[ValueName]:
+        parameters = []
+
+        self._expect("(")
+
+        if not self._check(")"):
+            while True:
+                if self._accept("..."):
+                    break
+
+                parameters.append(ValueName(LiteralNode(LiteralType.IDENTIFIER, self._expect_name())))
+
+                if not self._accept(","):
+                    break
+
+        self._expect(")")
+
+        return parameters
+
+    def _parse_local_statement(self) -> StatementNode:
+        local_token = self._expect("local")
+
+        if self._check("function"):
+            raise CompilerError("'local function' statement is not supported (position {})".format(
+                local_token.position))
+
+        lvalues = [ValueExpression(raw_value_name_to_ast_node(self._expect_name(), None))]
+
+        while self._accept(","):
+            lvalues.append(ValueExpression(raw_value_name_to_ast_node(self._expect_name(), None)))
+
+        if not self._accept("="):
+            raise CompilerError("Local declaration without initializer is not supported (position {})".format(
+                local_token.position))
+
+        return AssignmentStatement(ExpressionsTuple(lvalues), self._parse_rvalue_handle(), True)
+
+    def _parse_conditional_statement(self) -> StatementNode:
+        self._expect("if")
+        condition = self._parse_expression()
+        self._expect("then")
+
+        branches = [ConditionalBranchStatement(condition, self._parse_block())]
+        else_statements = None
+
+        while self._accept("elseif"):
+            condition = self._parse_expression()
+            self._expect("then")
+            branches.append(ConditionalBranchStatement(condition, self._parse_block()))
+
+        if self._accept("else"):
+            else_statements = self._parse_block()
+
+        self._expect("end")
+
+        return ConditionalStatement(branches, else_statements)
+
+    def _parse_for_statement(self) -> StatementNode:
+        self._expect("for")
+        counter_name = self._expect_name()
+
+        if not self._check("="):
+            raise CompilerError("Generic 'for' statement is not supported (position {})".format(
+                self._current.position))
+
+        self._expect("=")
+        start_expression = self._parse_expression()
+        self._expect(",")
+        end_expression = self._parse_expression()
+        step_expression = None
+
+        if self._accept(","):
+            step_expression = self._parse_expression()
+
+        self._expect("do")
+        body = self._parse_block()
+        self._expect("end")
+
+        return ForLoopStatement(raw_value_name_to_ast_node(counter_name, None), start_expression, end_expression,
+                                step_expression, body)
+
+    def _parse_rvalue_handle(self) -> ExpressionsTuple:
+        expressions = [self._parse_expression()]
+
+        while self._accept(","):
+            expressions.append(self._parse_expression())
+
+        return ExpressionsTuple(expressions)
+
+    def _parse_call_arguments(self) -> ExpressionsTuple:
+        if self._accept(")"):
+            return ExpressionsTuple([])
+
+        args = self._parse_rvalue_handle()
+        self._expect(")")
+
+        return args
+
+    def _parse_expression(self, min_precedence: int = 0) -> ExpressionNode:
+        left = self._parse_unary_expression()
+
+        while True:
+            token = self._current
+
+            if token.kind not in ("keyword", "operator"):
+                break
+
+            operator = token.text
+
+            if operator in _BINARY_OPERATORS:
+                precedence, expression_type = _BINARY_OPERATORS[operator]
+            elif operator in _UNSUPPORTED_BINARY_OPERATORS:
+                precedence, expression_type = _UNSUPPORTED_BINARY_OPERATORS[operator], None
+            else:
+                break
+
+            if precedence <= min_precedence:
+                break
+
+            self._position += 1
+
+            if expression_type is None:
+                raise NotImplementedError
+
+            # concatenation is the only right associative operator
+            right_min_precedence = precedence - 1 if precedence == _CONCAT_PRECEDENCE else precedence
+            right = self._parse_expression(right_min_precedence)
+
+            left = BinaryOperationExpression(left, right, expression_type)
+
+        return left
+
+    def _parse_unary_expression(self) -> ExpressionNode:
+        token = self._current
+
+        if token.kind in ("keyword", "operator"):
+            if token.text in _UNARY_OPERATORS:
+                self._position += 1
+                right = self._parse_expression(_UNARY_PRECEDENCE - 1)
+
+                return UnaryOperationExpression(right, _UNARY_OPERATORS[token.text])
+            elif token.text in ("#", "~"):
+                raise NotImplementedError
+
+        return self._parse_primary_expression()
+
+    def _parse_primary_expression(self) -> ExpressionNode:
+        token = self._current
+
+        if token.kind == "number":
+            self._position += 1
+            return LiteralNode(LiteralType.NUMBER, float(token.text))
+        elif token.kind == "string":
+            self._position += 1
+            return LiteralNode(LiteralType.STRING, str(token.text))
+        elif token.kind == "name":
+            value_name = self._parse_value_name()
+
+            if self._accept("("):
+                return FunctionCallExpression(value_name, self._parse_call_arguments(), False)
+
+            return value_name
+        elif token.kind == "keyword":
+            if self._accept("nil"):
+                return LiteralNode(LiteralType.NIL)
+            elif self._accept("true"):
+                return LiteralNode(LiteralType.BOOLEAN, True)
+            elif self._accept("false"):
+                return LiteralNode(LiteralType.BOOLEAN, False)
+            elif token.text == "function":
+                raise CompilerError("Function expressions are not supported (position {})".format(token.position))
+        elif token.kind == "operator":
+            if self._accept("("):
+                expression = self._parse_expression()
+                self._expect(")")
+
+                return expression
+            elif token.text in ("{", "..."):
+                raise CompilerError("'{}' expression is not supported (position {})".format(
+                    token.text, token.position))
+
+        self._raise_unexpected()
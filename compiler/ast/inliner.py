@@ -0,0 +1,227 @@
+import copy
+from typing import Dict, List, Optional
+
+from compiler.ast.ast_nodes.common import LiteralNode, LiteralType, ValueName
+from compiler.ast.ast_nodes.expression import ExpressionNode
+from compiler.ast.ast_nodes.expressions import ValueExpression, BinaryOperationExpression, \
+    UnaryOperationExpression, FunctionCallExpression
+from compiler.ast.ast_nodes.node import ASTNode
+from compiler.ast.ast_nodes.script import Script
+from compiler.ast.ast_nodes.statements import AssignmentStatement, FunctionDeclarationStatement, ReturnStatement, \
+    ForLoopStatement
+from compiler.opcodes.optimizer import OptimizationStats
+
+# Maximal size (operations and operands count) of the expression returned by the inlined function
+DEFAULT_INLINING_BUDGET = 12
+
+
+def _get_name(node: ASTNode) -> Optional[str]:
+    # Returns the plain name the node refers to or None for the other nodes (class values included)
+    if isinstance(node, ValueExpression):
+        node = node.value_name
+
+    if isinstance(node, ValueName) and not node.is_class_value:
+        return node.full_name
+
+    return None
+
+
+def _is_trivial(node: ASTNode) -> bool:
+    # Literals and names are read without side effects and errors, so they may be duplicated or dropped
+    return isinstance(node, LiteralNode) or _get_name(node) is not None
+
+
+def _is_pure(node: ASTNode) -> bool:
+    # Expression without calls, only its errors may be observed
+    if _is_trivial(node):
+        return True
+
+    if isinstance(node, (BinaryOperationExpression, UnaryOperationExpression)):
+        return all(_is_pure(child) for child in node.get_children())
+
+    return False
+
+
+def _get_size(node: ASTNode) -> int:
+    if _is_trivial(node):
+        return 1
+
+    return 1 + sum(_get_size(child) for child in node.get_children())
+
+
+class InlinedFunction:
+    def __init__(self, parameters: List[str], expression: ExpressionNode, parameters_usages: List[str]):
+        self._parameters = parameters
+        self._expression = expression
+        self._parameters_usages = parameters_usages
+
+    @property
+    def parameters(self) -> List[str]:
+        return self._parameters
+
+    @property
+    def expression(self) -> ExpressionNode:
+        return self._expression
+
+    @property
+    def parameters_usages(self) -> List[str]:
+        # Parameters in the order they are evaluated by the expression
+        return self._parameters_usages
+
+
+# Replaces calls of the small global functions returning an expression of their parameters by that expression.
+# Function is inlined only if its name is bound once in the whole program, and only after its declaration,
+# so the call always refers to the declared function. Arguments are substituted only if this does not change
+# the number and the order of their evaluations
+class FunctionsInliner:
+    def __init__(self, inlining_budget: int = DEFAULT_INLINING_BUDGET, stats: Optional[OptimizationStats] = None):
+        self._inlining_budget = inlining_budget
+        self._stats = stats if stats is not None else OptimizationStats()
+        self._functions: Dict[str, InlinedFunction] = {}
+
+    @property
+    def stats(self) -> OptimizationStats:
+        return self._stats
+
+    def inline(self, tree: ASTNode) -> ASTNode:
+        if not isinstance(tree, Script):
+            return tree
+
+        bindings_counts = self._count_bindings(tree)
+        statements = tree.statements_block.statements
+
+        for index, statement in enumerate(statements):
+            statements[index] = self._inline_calls(statement)
+
+            if isinstance(statement, FunctionDeclarationStatement) and \
+                    bindings_counts.get(_get_name(statement.name)) == 1:
+                function = self._get_inlined_function(statement)
+
+                if function is not None:
+                    self._functions[statement.name.full_name] = function
+
+        return tree
+
+    @staticmethod
+    def _count_bindings(tree: ASTNode) -> Dict[str, int]:
+        bindings_counts = {}
+        nodes = [tree]
+
+        while nodes:
+            node = nodes.pop()
+            names = []
+
+            if isinstance(node, AssignmentStatement):
+                names.extend(_get_name(expression) for expression in node.lvalue_tuple.expressions)
+            elif isinstance(node, FunctionDeclarationStatement):
+                names.append(node.name.full_name)
+                names.extend(parameter.full_name for parameter in node.parameters)
+            elif isinstance(node, ForLoopStatement):
+                names.append(node.counter_name.full_name)
+
+            for name in names:
+                bindings_counts[name] = bindings_counts.get(name, 0) + 1
+
+            nodes.extend(node.get_children())
+
+        return bindings_counts
+
+    def _get_inlined_function(self, declaration: FunctionDeclarationStatement) -> Optional[InlinedFunction]:
+        statements = declaration.statements_block.statements
+
+        if declaration.name.is_class_value or len(statements) != 1 or not isinstance(statements[0], ReturnStatement):
+            return None
+
+        expressions = statements[0].rvalue_tuple.expressions
+        parameters = [parameter.full_name for parameter in declaration.parameters]
+
+        if len(expressions) != 1 or len(set(parameters)) != len(parameters):
+            return None
+
+        parameters_usages = []
+
+        if not self._collect_parameters_usages(expressions[0], parameters, parameters_usages) or \
+                _get_size(expressions[0]) > self._inlining_budget:
+            return None
+
+        return InlinedFunction(parameters, expressions[0], parameters_usages)
+
+    @classmethod
+    def _collect_parameters_usages(cls, node: ASTNode, parameters: List[str], parameters_usages: List[str]) -> bool:
+        # Only literals and parameters are allowed as the operands, so the expression is a leaf without side effects
+        name = _get_name(node)
+
+        if name is not None:
+            parameters_usages.append(name)
+            return name in parameters
+        elif isinstance(node, LiteralNode):
+            return node.type != LiteralType.IDENTIFIER
+        elif isinstance(node, (BinaryOperationExpression, UnaryOperationExpression)):
+            return all(cls._collect_parameters_usages(child, parameters, parameters_usages)
+                       for child in node.get_children())
+
+        return False
+
+    def _inline_calls(self, node: ASTNode) -> ASTNode:
+        for name, value in list(vars(node).items()):
+            if isinstance(value, ASTNode):
+                setattr(node, name, self._inline_calls(value))
+            elif isinstance(value, list):
+                setattr(node, name, [self._inline_calls(item) if isinstance(item, ASTNode) else item
+                                     for item in value])
+
+        if isinstance(node, FunctionCallExpression) and not node.is_orphan:
+            inlined_expression = self._inline_call(node)
+
+            if inlined_expression is not None:
+                self._stats.inlined_calls += 1
+                return inlined_expression
+
+        return node
+
+    def _inline_call(self, call: FunctionCallExpression) -> Optional[ExpressionNode]:
+        function = self._functions.get(_get_name(call.callable))
+
+        if function is None:
+            return None
+
+        args = call.args.expressions
+        parameters = function.parameters
+
+        # Surplus arguments are not evaluated by the inlined expression
+        if not all(_is_pure(arg) for arg in args) or not all(_is_trivial(arg) for arg in args[len(parameters):]):
+            return None
+
+        arguments = {}
+        evaluated_parameters = []
+
+        for index, parameter in enumerate(parameters):
+            arg = args[index] if index < len(args) else LiteralNode(LiteralType.NIL)
+
+            if not _is_trivial(arg):
+                if function.parameters_usages.count(parameter) != 1:
+                    return None
+
+                evaluated_parameters.append(parameter)
+
+            arguments[parameter] = arg
+
+        usages_order = [parameter for parameter in function.parameters_usages if parameter in evaluated_parameters]
+
+        if usages_order != evaluated_parameters:
+            return None
+
+        return self._substitute(copy.deepcopy(function.expression), arguments)
+
+    @classmethod
+    def _substitute(cls, node: ASTNode, arguments: Dict[str, ExpressionNode]) -> ASTNode:
+        name = _get_name(node)
+
+        if name is not None:
+            return copy.deepcopy(arguments[name])
+
+        for attribute_name, value in list(vars(node).items()):
+            if isinstance(value, ASTNode):
+                setattr(node, attribute_name, cls._substitute(value, arguments))
+
+        return node
@@ -0,0 +1,198 @@
+from antlr4 import ParseTreeVisitor
+
+from compiler.ast.ast_nodes.common import LiteralNode, LiteralType, ValueName
+from compiler.ast.ast_nodes.expressions import ExpressionsTuple, ValueExpression, BinaryOperationExpression, \
+    BinaryExpressionType, UnaryOperationExpression, UnaryExpressionType, FunctionCallExpression
+from compiler.ast.ast_nodes.script import Script, StatementsBlock
+from compiler.ast.ast_nodes.statements import AssignmentStatement, FunctionDeclarationStatement, ReturnStatement, \
+    BreakStatement, ConditionalStatement, ConditionalBranchStatement, ForLoopStatement
+from compiler.ast.parse_nodes.helpers import raw_value_name_to_ast_node
+from compiler.exceptions.common import CompilerError
+
+_BINARY_OPERATIONS = {
+    "+": BinaryExpressionType.ADD,
+    "-": BinaryExpressionType.SUBTRACT,
+    "*": BinaryExpressionType.MULTIPLY,
+    "/": BinaryExpressionType.DIVIDE,
+    "and": BinaryExpressionType.BOOLEAN_AND,
+    "or": BinaryExpressionType.BOOLEAN_OR,
+    "==": BinaryExpressionType.CMP_EQ,
+    ">": BinaryExpressionType.CMP_GT,
+    "<": BinaryExpressionType.CMP_LT,
+    "<=": BinaryExpressionType.CMP_LE,
+    ">=": BinaryExpressionType.CMP_GE,
+    "~=": BinaryExpressionType.CMP_NE,
+    "..": BinaryExpressionType.CONCAT,
+}
+
+_UNARY_OPERATIONS = {
+    "-": UnaryExpressionType.MINUS,
+    "not": UnaryExpressionType.NOT,
+}
+
+
+def _get_token_text(token):
+    return token.text if token is not None else None
+
+
+# Builds the AST nodes right from the ANTLR parse tree in one pass, so the intermediate tree of the parse nodes
+# is not created. Nodes are the same as built by the parse nodes transformations
+class ASTBuildingVisitor(ParseTreeVisitor):
+    def visitRoot(self, ctx):
+        return Script(self.visit(ctx.block()))
+
+    def visitBlock(self, ctx):
+        statements = [self.visit(statement) for statement in ctx.statements]
+
+        if ctx.return_statement() is not None:
+            statements.append(self.visit(ctx.return_statement()))
+
+        return StatementsBlock(statements)
+
+    def visitLb_block_end_return_statement(self, ctx):
+        return ReturnStatement(self._visit_optional_rvalue(ctx.rvalue_handle()))
+
+    def visitLb_block_end_break_statement(self, ctx):
+        return BreakStatement()
+
+    def visitLb_assignment_statement(self, ctx):
+        return AssignmentStatement(self.visit(ctx.attr_lvalue), self.visit(ctx.attr_rvalue), False)
+
+    def visitLb_local_lvalue_declaration_statement(self, ctx):
+        if ctx.attr_rvalue is None:
+            raise CompilerError("Local declaration without initializer is not supported (line {})".format(
+                ctx.start.line))
+
+        return AssignmentStatement(self.visit(ctx.attr_lvalue), self.visit(ctx.attr_rvalue), True)
+
+    def visitLb_call_statement(self, ctx):
+        call = ctx.function_call_statement()
+        value_name = raw_value_name_to_ast_node(call.top_level_name.text, _get_token_text(call.class_level_name))
+
+        return FunctionCallExpression(ValueExpression(value_name), self._visit_optional_rvalue(call.rvalue_handle()),
+                                      True)
+
+    def visitLb_conditional_statement(self, ctx):
+        branches = [ConditionalBranchStatement(self.visit(ctx.expression()), self.visit(ctx.attr_then_block))]
+
+        for elseif_item in ctx.statement_elseif_item():
+            branches.append(ConditionalBranchStatement(self.visit(elseif_item.expression()),
+                                                       self.visit(elseif_item.block())))
+
+        else_block = self.visit(ctx.attr_else_block) if ctx.attr_else_block is not None else None
+
+        return ConditionalStatement(branches, else_block)
+
+    def visitLb_for_statement(self, ctx):
+        return ForLoopStatement(raw_value_name_to_ast_node(ctx.attr_counter.text, None),
+                                self.visit(ctx.attr_start),
+                                self.visit(ctx.attr_end),
+                                self.visit(ctx.attr_step) if ctx.attr_step is not None else None,
+                                self.visit(ctx.block()))
+
+    def visitLb_function_declaration_statement(self, ctx):
+        function_body = ctx.function_body()
+        parameters_list = function_body.function_parameters_list()
+        parameters = []
+
+        if parameters_list is not None and parameters_list.lvalue_identifiers_list() is not None:
+            for name in parameters_list.lvalue_identifiers_list().NAME():
+                parameters.append(ValueName(LiteralNode(LiteralType.IDENTIFIER, name.getText())))
+
+        return FunctionDeclarationStatement(
+            raw_value_name_to_ast_node(ctx.top_level_name.text, _get_token_text(ctx.class_level_name)),
+            parameters,
+            self.visit(function_body.block()))
+
+    def visitLvalue_handle(self, ctx):
+        return ExpressionsTuple([self.visit(expression) for expression in ctx.expressions])
+
+    def visitRvalue_handle(self, ctx):
+        return ExpressionsTuple([self.visit(expression) for expression in ctx.expressions])
+
+    def visitLvalue_identifiers_list(self, ctx):
+        return ExpressionsTuple([ValueExpression(raw_value_name_to_ast_node(name.getText(), None))
+                                 for name in ctx.NAME()])
+
+    def visitExpression_assignable(self, ctx):
+        return ValueExpression(self.visit(ctx.expression_value()))
+
+    def visitExpression_value(self, ctx):
+        return raw_value_name_to_ast_node(ctx.top_level_name.text, _get_token_text(ctx.class_level_name))
+
+    def visitExpression_callable(self, ctx):
+        if ctx.expression_value() is not None:
+            return self.visit(ctx.expression_value())
+
+        return LiteralNode(LiteralType.STRING, ctx.string().getText())
+
+    def visitLb_nil_literal_expression(self, ctx):
+        return LiteralNode(LiteralType.NIL)
+
+    def visitLb_false_literal_expression(self, ctx):
+        return LiteralNode(LiteralType.BOOLEAN, False)
+
+    def visitLb_true_literal_expression(self, ctx):
+        return LiteralNode(LiteralType.BOOLEAN, True)
+
+    def visitLb_number_literal_expression(self, ctx):
+        return LiteralNode(LiteralType.NUMBER, float(ctx.number_value.getText()))
+
+    def visitLb_string_literal_expression(self, ctx):
+        return LiteralNode(LiteralType.STRING, str(ctx.string_value.getText()))
+
+    def visitLb_brackets_expression(self, ctx):
+        return self.visit(ctx.expression())
+
+    def visitLb_unary_expression(self, ctx):
+        expression_type = _UNARY_OPERATIONS.get(ctx.operation.text)
+
+        if expression_type is None:
+            raise NotImplementedError
+
+        return UnaryOperationExpression(self.visit(ctx.right), expression_type)
+
+    def visitLb_binary_term_expression(self, ctx):
+        return self._visit_binary_expression(ctx)
+
+    def visitLb_binary_expr_expression(self, ctx):
+        return self._visit_binary_expression(ctx)
+
+    def visitLb_concat_expression(self, ctx):
+        return self._visit_binary_expression(ctx)
+
+    def visitLb_logic_equal_expression(self, ctx):
+        return self._visit_binary_expression(ctx)
+
+    def visitLb_logic_and_expression(self, ctx):
+        return self._visit_binary_expression(ctx)
+
+    def visitLb_logic_or_expression(self, ctx):
+        return self._visit_binary_expression(ctx)
+
+    def visitLb_bit_expression(self, ctx):
+        raise NotImplementedError
+
+    def visitLb_value_expression(self, ctx):
+        return self.visit(ctx.expression_value())
+
+    def visitLb_call_expression(self, ctx):
+        call = ctx.expression_call()
+
+        return FunctionCallExpression(self.visit(call.expression_callable()),
+                                      self._visit_optional_rvalue(call.rvalue_handle()), False)
+
+    def visitChildren(self, node):
+        # Every supported rule has its own visit method, so the rest are not supported by the compiler
+        raise CompilerError("Unsupported construction '{}' (line {})".format(node.getText(), node.start.line))
+
+    def _visit_binary_expression(self, ctx):
+        expression_type = _BINARY_OPERATIONS.get(ctx.operation.text)
+
+        if expression_type is None:
+            raise NotImplementedError
+
+        return BinaryOperationExpression(self.visit(ctx.left), self.visit(ctx.right), expression_type)
+
+    def _visit_optional_rvalue(self, ctx) -> ExpressionsTuple:
+        return self.visit(ctx) if ctx is not None else ExpressionsTuple([])
@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from compiler.opcodes_compiler import OPCodesCompiler, ParserType
+from utils.files import read_all_text
+from vm.opcodes.IO import OPCodesIO
+
+
+class BatchCompilationResult:
+    def __init__(self, source_path: str, bytecode: Optional[bytes] = None, error: Optional[str] = None):
+        self._source_path = source_path
+        self._bytecode = bytecode
+        self._error = error
+
+    @property
+    def source_path(self) -> str:
+        return self._source_path
+
+    @property
+    def bytecode(self) -> Optional[bytes]:
+        return self._bytecode
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @property
+    def succeeded(self) -> bool:
+        return self._error is None
+
+
+def compile_file(source_path: str, optimize: bool = True, parser_type: ParserType = ParserType.ANTLR,
+                 cache_directory: Optional[str] = None, inlining_budget: int = 0) -> BatchCompilationResult:
+    # Runs in the worker processes, so failures are returned as the results instead of being raised
+    try:
+        cache = OPCodesCompiler.create_cache(cache_directory) if cache_directory is not None else None
+        program = OPCodesCompiler.compile(read_all_text(source_path), optimize, cache=cache, parser_type=parser_type,
+                                          inlining_budget=inlining_budget)
+
+        return BatchCompilationResult(source_path, bytecode=OPCodesIO.get_program_bytes(program))
+    except Exception as error:
+        return BatchCompilationResult(source_path, error="{}: {}".format(type(error).__name__, error))
+
+
+# Compiles many scripts in parallel, every script is compiled by one of the worker processes
+# and returned in the binary bytecode format
+class BatchCompiler:
+    def __init__(self, max_workers: Optional[int] = None, optimize: bool = True,
+                 parser_type: ParserType = ParserType.ANTLR, cache_directory: Optional[str] = None,
+                 inlining_budget: int = 0):
+        self._max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+        self._optimize = optimize
+        self._parser_type = parser_type
+        self._cache_directory = cache_directory
+        self._inlining_budget = inlining_budget
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def compile_files(self, source_paths: List[str]) -> List[BatchCompilationResult]:
+        if not source_paths:
+            return []
+
+        workers_count = min(self._max_workers, len(source_paths))
+
+        if workers_count == 1:
+            return [self._compile_file(source_path) for source_path in source_paths]
+
+        # Scripts are sent in chunks to reduce the inter-process communication overhead for the small ones
+        chunk_size = max(1, len(source_paths) // (workers_count * 4))
+
+        with ProcessPoolExecutor(max_workers=workers_count) as executor:
+            return list(executor.map(compile_file, source_paths,
+                                     [self._optimize] * len(source_paths),
+                                     [self._parser_type] * len(source_paths),
+                                     [self._cache_directory] * len(source_paths),
+                                     [self._inlining_budget] * len(source_paths),
+                                     chunksize=chunk_size))
+
+    def _compile_file(self, source_path: str) -> BatchCompilationResult:
+        return compile_file(source_path, self._optimize, self._parser_type, self._cache_directory,
+                            self._inlining_budget)
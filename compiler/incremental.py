@@ -0,0 +1,119 @@
+import hashlib
+from typing import List, Dict, Optional
+
+from compiler.ast.fast_parser import tokenize
+from compiler.opcodes.cache import BytecodeCache
+from compiler.opcodes.linker import OPCodesLinker
+from compiler.opcodes_compiler import OPCodesCompiler, ParserType, COMPILER_VERSION
+from vm.opcodes.opcodes import OPCode
+
+_BLOCK_OPENING_KEYWORDS = ("function", "if", "do", "repeat")
+_BLOCK_CLOSING_KEYWORDS = ("end", "until")
+
+
+def split_compilation_units(raw_program_text: str) -> List[str]:
+    # Every top level function declaration is a separate unit, statements between them are grouped to the units
+    # of the top level code. Code of the unit does not depend on the other units except the addresses, since
+    # functions have their own frames and top level names are resolved at runtime
+    tokens = tokenize(raw_program_text)
+    units = []
+    unit_start = 0
+    unit_first_token_index = 0
+    function_start = None
+    depth = 0
+
+    for token_index, token in enumerate(tokens):
+        if token.kind != "keyword":
+            continue
+
+        if token.text in _BLOCK_OPENING_KEYWORDS:
+            if depth == 0 and token.text == "function" and tokens[token_index + 1].kind == "name" and \
+                    (token_index == 0 or tokens[token_index - 1].text != "local"):
+                # Text without tokens between the functions (whitespaces and comments) produces no code
+                if token_index > unit_first_token_index:
+                    units.append(raw_program_text[unit_start:token.position])
+
+                function_start = token.position
+
+            depth += 1
+        elif token.text in _BLOCK_CLOSING_KEYWORDS and depth > 0:
+            depth -= 1
+
+            if depth == 0 and function_start is not None:
+                unit_end = token.position + len(token.text)
+                unit_first_token_index = token_index + 1
+
+                # Statements separator is not a statement itself, so it stays with the declaration
+                if tokens[token_index + 1].kind == "operator" and tokens[token_index + 1].text == ";":
+                    unit_end = tokens[token_index + 1].position + 1
+                    unit_first_token_index += 1
+
+                units.append(raw_program_text[function_start:unit_end])
+                unit_start = unit_end
+                function_start = None
+
+    # The last token marks the end of input
+    if len(tokens) - 1 > unit_first_token_index:
+        units.append(raw_program_text[unit_start:])
+
+    return units
+
+
+# Compiles the program unit by unit and reuses the code of the units which did not change since the previous
+# compilation, so recompilation of the edited program takes time proportional to the change
+class IncrementalCompiler:
+    def __init__(self, optimize: bool = True, parser_type: ParserType = ParserType.ANTLR,
+                 cache: Optional[BytecodeCache] = None):
+        self._optimize = optimize
+        self._parser_type = parser_type
+        self._cache = cache
+        self._units: Dict[str, List[OPCode]] = {}
+        self._compiled_units_count = 0
+        self._reused_units_count = 0
+
+    @property
+    def compiled_units_count(self) -> int:
+        return self._compiled_units_count
+
+    @property
+    def reused_units_count(self) -> int:
+        return self._reused_units_count
+
+    def compile(self, raw_program_text: str) -> List[OPCode]:
+        self._compiled_units_count = 0
+        self._reused_units_count = 0
+
+        units = {}
+        units_codes = []
+
+        for unit_text in split_compilation_units(raw_program_text):
+            unit_hash = self._get_unit_hash(unit_text)
+            unit_code = units.get(unit_hash)
+
+            if unit_code is None:
+                unit_code = self._units.get(unit_hash)
+
+            if unit_code is None:
+                unit_code = self._compile_unit(unit_text)
+                self._compiled_units_count += 1
+            else:
+                self._reused_units_count += 1
+
+            units[unit_hash] = unit_code
+            units_codes.append(unit_code)
+
+        # Only units of the last compiled version are kept, so removed functions do not accumulate
+        self._units = units
+
+        return OPCodesLinker.link(units_codes)
+
+    def _get_unit_hash(self, unit_text: str) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(COMPILER_VERSION.encode("utf-8"))
+        hasher.update(b"\0optimized\0" if self._optimize else b"\0plain\0")
+        hasher.update(unit_text.encode("utf-8"))
+
+        return hasher.hexdigest()
+
+    def _compile_unit(self, unit_text: str) -> List[OPCode]:
+        return OPCodesCompiler.compile(unit_text, self._optimize, cache=self._cache, parser_type=self._parser_type)
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import struct
+import tempfile
+from typing import List, Optional, Dict
+
+from compiler.opcodes.optimizer import OptimizationStats
+from vm.exceptions.common import OPCodeValidationError
+from vm.opcodes.IO import OPCodesIO
+from vm.opcodes.opcodes import OPCode
+
+_CACHE_FILE_EXTENSION = ".luac"
+
+
+# Compiled programs are stored in the binary format prefixed with the header line of the compiler version
+# and the source hash, so entries of the other compiler versions or the corrupted ones are never returned.
+# Header is followed by the line of the optimization stats collected by the compilation of the entry
+class BytecodeCache:
+    def __init__(self, cache_directory: str, compiler_version: str):
+        self._cache_directory = cache_directory
+        self._compiler_version = compiler_version
+
+    @property
+    def cache_directory(self) -> str:
+        return self._cache_directory
+
+    def get_key(self, raw_program_text: str, optimize: bool, inlining_budget: int = 0) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(self._compiler_version.encode("utf-8"))
+        hasher.update(b"\0optimized\0" if optimize else b"\0plain\0")
+        hasher.update("inlining {}\0".format(inlining_budget).encode("utf-8"))
+        hasher.update(raw_program_text.encode("utf-8"))
+
+        return hasher.hexdigest()
+
+    def load(self, key: str, stats: Optional[OptimizationStats] = None) -> Optional[List[OPCode]]:
+        entry_path = self._get_entry_path(key)
+
+        try:
+            with open(entry_path, "rb") as entry_file:
+                header = entry_file.readline()
+                stats_line = entry_file.readline()
+                program_bytes = entry_file.read()
+        except OSError:
+            return None
+
+        if header != self._get_header(key):
+            self._remove_entry(entry_path)
+            return None
+
+        try:
+            counters = self._parse_stats_line(stats_line)
+            program = list(OPCodesIO.parse_program_bytes(program_bytes))
+        except (OPCodeValidationError, ValueError, struct.error):
+            self._remove_entry(entry_path)
+            return None
+
+        if stats is not None:
+            stats.add(counters)
+
+        return program
+
+    def store(self, key: str, program: List[OPCode], stats: Optional[OptimizationStats] = None) -> bool:
+        # Program is stored only if it is read back unchanged, so the entry never makes the compilation miss
+        # on every run. Returns whether the entry is stored
+        try:
+            program_bytes = OPCodesIO.get_program_bytes(program)
+        except OPCodeValidationError:
+            return False
+
+        if not self._is_same_program(list(OPCodesIO.parse_program_bytes(program_bytes)), program):
+            return False
+
+        os.makedirs(self._cache_directory, exist_ok=True)
+
+        content = self._get_header(key) + self._get_stats_line(stats or OptimizationStats()) + program_bytes
+
+        # Entry is written to the temporary file first and then renamed, so readers never observe a partial entry
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self._cache_directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as entry_file:
+                entry_file.write(content)
+
+            os.replace(temporary_path, self._get_entry_path(key))
+        except BaseException:
+            self._remove_entry(temporary_path)
+            raise
+
+        return True
+
+    def prune(self) -> int:
+        # Removes entries written by the other compiler versions
+        removed_entries_count = 0
+
+        if not os.path.isdir(self._cache_directory):
+            return removed_entries_count
+
+        for file_name in os.listdir(self._cache_directory):
+            if not file_name.endswith(_CACHE_FILE_EXTENSION):
+                continue
+
+            entry_path = os.path.join(self._cache_directory, file_name)
+            key = file_name[:-len(_CACHE_FILE_EXTENSION)]
+
+            try:
+                with open(entry_path, "rb") as entry_file:
+                    header = entry_file.readline()
+            except OSError:
+                continue
+
+            if header != self._get_header(key):
+                self._remove_entry(entry_path)
+                removed_entries_count += 1
+
+        return removed_entries_count
+
+    def _get_header(self, key: str) -> bytes:
+        return "-- lua-vm {} {}\n".format(self._compiler_version, key).encode("utf-8")
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self._cache_directory, key + _CACHE_FILE_EXTENSION)
+
+    @staticmethod
+    def _get_stats_line(stats: OptimizationStats) -> bytes:
+        return " ".join("{}={}".format(name, value) for name, value in stats.counters.items()).encode("utf-8") + b"\n"
+
+    @staticmethod
+    def _parse_stats_line(stats_line: bytes) -> Dict[str, int]:
+        if not stats_line.endswith(b"\n"):
+            raise ValueError("Stats line of the entry is truncated")
+
+        known_names = OptimizationStats().counters.keys()
+        counters = {}
+
+        for counter in stats_line.decode("utf-8").split():
+            name, _, value = counter.partition("=")
+
+            if name not in known_names:
+                raise ValueError("Unknown stats counter: {}".format(name))
+
+            counters[name] = int(value)
+
+        return counters
+
+    @staticmethod
+    def _is_same_program(loaded_program: List[OPCode], program: List[OPCode]) -> bool:
+        return [(opcode.type, opcode.args) for opcode in loaded_program] == \
+               [(opcode.type, opcode.args) for opcode in program]
+
+    @staticmethod
+    def _remove_entry(entry_path: str):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
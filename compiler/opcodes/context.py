@@ -1,12 +1,60 @@
-from typing import List
+from typing import List, Dict, Optional, Set
 
 from vm.opcodes.IO import OPCodesIO
-from vm.opcodes.opcodes import OPCode
+from vm.opcodes.opcodes import OPCode, OPCodeType, FUSED_COMPARISON_JUMPS
+
+_FUSED_JUMPS = {
+    comparison: fused_jump_type for fused_jump_type, comparison in FUSED_COMPARISON_JUMPS.items()
+}
+
+
+class FunctionFrame:
+    def __init__(self, captured_names: Optional[Set[str]]):
+        # Names used by the nested functions are kept in the runtime scopes and looked up by name,
+        # frame of the top level code (without captured names set) keeps all names in the runtime scopes
+        self._captured_names = captured_names
+        self._blocks: List[Dict[str, Optional[int]]] = [{}]
+        self._slots_count = 0
+
+    @property
+    def slots_count(self) -> int:
+        return self._slots_count
+
+    def enter_block(self):
+        self._blocks.append({})
+
+    def exit_block(self):
+        self._blocks.pop()
+
+    def declare_local(self, name: str) -> Optional[int]:
+        if self._captured_names is None or name in self._captured_names:
+            slot = None
+        else:
+            slot = self.reserve_slots(1)
+
+        self._blocks[-1][name] = slot
+
+        return slot
+
+    def reserve_slots(self, count: int) -> int:
+        # Reserves unnamed slots and returns the first of them
+        first_slot = self._slots_count
+        self._slots_count += count
+
+        return first_slot
+
+    def resolve_local(self, name: str) -> Optional[int]:
+        for block in reversed(self._blocks):
+            if name in block:
+                return block[name]
+
+        return None
 
 
 class OPCodesCompilationContext:
     def __init__(self):
         self._opcodes: List[OPCode] = []
+        self._frames: List[FunctionFrame] = [FunctionFrame(None)]
 
     @property
     def program(self) -> List[OPCode]:
@@ -20,9 +68,64 @@ class OPCodesCompilationContext:
     def current_opcode(self) -> OPCode:
         return self._opcodes[-1]
 
+    @property
+    def in_function(self) -> bool:
+        return len(self._frames) > 1
+
     @property
     def program_text(self) -> str:
         return OPCodesIO.get_program_text(self._opcodes)
 
     def add_opcode(self, opcode: OPCode):
         self._opcodes.append(opcode)
+
+    def add_conditional_jump(self, jump_type: OPCodeType, jump_address: int):
+        # Comparison emitted right before the jump is fused with it, so its result is never pushed to the stack
+        jump_result = jump_type == OPCodeType.JUMP_POS
+        fused_jump_type = None
+
+        if self._opcodes:
+            fused_jump_type = _FUSED_JUMPS.get((self._opcodes[-1].type, jump_result))
+
+        if fused_jump_type is None:
+            self.add_opcode(OPCode(jump_type, [jump_address]))
+        else:
+            self._opcodes[-1] = OPCode(fused_jump_type, [jump_address])
+
+    def enter_function(self, captured_names: Set[str]):
+        self._frames.append(FunctionFrame(captured_names))
+
+    def exit_function(self) -> int:
+        return self._frames.pop().slots_count
+
+    def enter_block(self):
+        self._frames[-1].enter_block()
+
+    def exit_block(self):
+        self._frames[-1].exit_block()
+
+    def declare_local(self, name: str) -> Optional[int]:
+        # Returns frame slot of the declared local or None if the local should be declared in the runtime scope
+        return self._frames[-1].declare_local(name)
+
+    def resolve_local(self, name: str) -> Optional[int]:
+        return self._frames[-1].resolve_local(name)
+
+    def reserve_slots(self, count: int) -> int:
+        return self._frames[-1].reserve_slots(count)
+
+    def add_load_variable(self, name: str):
+        slot = self.resolve_local(name)
+
+        if slot is None:
+            self.add_opcode(OPCode(OPCodeType.PUSH, [name]))
+        else:
+            self.add_opcode(OPCode(OPCodeType.LOAD_LOCAL, [slot]))
+
+    def add_store_variable(self, name: str):
+        slot = self.resolve_local(name)
+
+        if slot is None:
+            self.add_opcode(OPCode(OPCodeType.ASSIGN, [name]))
+        else:
+            self.add_opcode(OPCode(OPCodeType.STORE_LOCAL, [slot]))
@@ -0,0 +1,24 @@
+from typing import List
+
+from vm.opcodes.opcodes import OPCode, JUMP_ADDRESS_ARGS
+
+
+# Splices separately compiled units into one program: addresses of every unit start from zero,
+# so jump targets are relocated by the address the unit is placed at
+class OPCodesLinker:
+    @staticmethod
+    def link(units: List[List[OPCode]]) -> List[OPCode]:
+        program = []
+
+        for unit in units:
+            base_address = len(program)
+
+            for opcode in unit:
+                args = list(opcode.args)
+
+                if opcode.type in JUMP_ADDRESS_ARGS:
+                    args[JUMP_ADDRESS_ARGS[opcode.type]] += base_address
+
+                program.append(OPCode(opcode.type, args))
+
+        return program
@@ -0,0 +1,202 @@
+from typing import List, Set, Dict
+
+from vm.opcodes.loader import OPCodesLoader
+from vm.opcodes.opcodes import OPCode, OPCodeType, JUMP_ADDRESS_ARGS
+
+# Instructions without side effects which results may be dropped together with the following 'pop'
+_PURE_PUSH_OPCODES = (OPCodeType.PUSH, OPCodeType.LOAD_LOCAL)
+
+
+class OptimizationStats:
+    def __init__(self):
+        self.instructions_before = 0
+        self.instructions_after = 0
+        self.threaded_jumps = 0
+        self.removed_dead_instructions = 0
+        self.removed_push_pop_pairs = 0
+        self.removed_scope_pairs = 0
+        self.removed_jumps = 0
+        self.inlined_calls = 0
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+    def add(self, counters: Dict[str, int]):
+        for name, value in counters.items():
+            setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def removed_instructions(self) -> int:
+        return self.instructions_before - self.instructions_after
+
+    @property
+    def report(self) -> str:
+        return "\n".join([
+            "Instructions before optimization: {}".format(self.instructions_before),
+            "Instructions after optimization: {}".format(self.instructions_after),
+            "Instructions removed: {}".format(self.removed_instructions),
+            "  dead instructions: {}".format(self.removed_dead_instructions),
+            "  push/pop pairs: {}".format(self.removed_push_pop_pairs),
+            "  scope pairs without locals: {}".format(self.removed_scope_pairs),
+            "  jumps to the next instruction: {}".format(self.removed_jumps),
+            "Jumps threaded: {}".format(self.threaded_jumps),
+            "Calls inlined: {}".format(self.inlined_calls),
+        ])
+
+
+# Peephole optimizer of the compiled program: instructions are only marked as removed by the passes
+# and jump addresses are relocated once at the end
+class OPCodesOptimizer:
+    def __init__(self, program: List[OPCode], stats: OptimizationStats = None):
+        self._program = [OPCode(opcode.type, list(opcode.args)) for opcode in program]
+        self._stats = stats if stats is not None else OptimizationStats()
+        self._functions_ends: Dict[int, int] = OPCodesLoader.get_functions_ends(self._program)
+        self._removed: Set[int] = set()
+
+    @property
+    def stats(self) -> OptimizationStats:
+        return self._stats
+
+    def optimize(self) -> List[OPCode]:
+        self._stats.instructions_before += len(self._program)
+
+        self._thread_jumps()
+        self._remove_dead_instructions()
+        self._remove_push_pop_pairs()
+        self._remove_scope_pairs()
+        self._remove_jumps_to_next_instruction()
+
+        program = self._relocate()
+        self._stats.instructions_after += len(program)
+
+        return program
+
+    def _thread_jumps(self):
+        # Jump to the unconditional jump is replaced with the jump to its final target
+        for opcode in self._program:
+            if opcode.type not in JUMP_ADDRESS_ARGS:
+                continue
+
+            arg_index = JUMP_ADDRESS_ARGS[opcode.type]
+            target = opcode.args[arg_index]
+            visited_targets = set()
+
+            while target < len(self._program) and self._program[target].type == OPCodeType.JUMP and \
+                    target not in visited_targets:
+                visited_targets.add(target)
+                target = self._program[target].first_arg
+
+            if target != opcode.args[arg_index]:
+                opcode.args[arg_index] = target
+                self._stats.threaded_jumps += 1
+
+    def _get_successors(self, address: int) -> List[int]:
+        opcode = self._program[address]
+
+        if opcode.type == OPCodeType.JUMP:
+            return [opcode.first_arg]
+        elif opcode.type in (OPCodeType.RETURN, OPCodeType.TAILCALL):
+            return []
+        elif opcode.type in JUMP_ADDRESS_ARGS:
+            return [address + 1, opcode.args[JUMP_ADDRESS_ARGS[opcode.type]]]
+        elif opcode.type == OPCodeType.FUNCTION:
+            # Body is entered by the calls of the declared function
+            return [address + 1, self._functions_ends[address] + 1]
+
+        return [address + 1]
+
+    def _remove_dead_instructions(self):
+        reachable_addresses = set()
+        pending_addresses = [0]
+
+        while pending_addresses:
+            address = pending_addresses.pop()
+
+            if address in reachable_addresses or address >= len(self._program):
+                continue
+
+            reachable_addresses.add(address)
+            pending_addresses.extend(self._get_successors(address))
+
+        for address, opcode in enumerate(self._program):
+            # Scope bounds are kept, since they define the program structure (e.g. functions extents)
+            if address in reachable_addresses or opcode.type in (OPCodeType.BEGIN_SCOPE, OPCodeType.END_SCOPE):
+                continue
+
+            self._removed.add(address)
+            self._stats.removed_dead_instructions += 1
+
+    def _get_jump_targets(self) -> Set[int]:
+        return {
+            opcode.args[JUMP_ADDRESS_ARGS[opcode.type]]
+            for address, opcode in enumerate(self._program)
+            if opcode.type in JUMP_ADDRESS_ARGS and address not in self._removed
+        }
+
+    def _remove_push_pop_pairs(self):
+        jump_targets = self._get_jump_targets()
+
+        for address in range(len(self._program) - 1):
+            if address in self._removed or address + 1 in self._removed or address + 1 in jump_targets:
+                continue
+
+            if self._program[address].type in _PURE_PUSH_OPCODES and \
+                    self._program[address + 1].type == OPCodeType.POP:
+                self._removed.update((address, address + 1))
+                self._stats.removed_push_pop_pairs += 1
+
+    def _remove_scope_pairs(self):
+        # Scope is not needed if nothing is declared in it directly, so names are resolved the same way without it
+        opened_scopes = []
+        scopes_with_locals = set()
+
+        for address, opcode in enumerate(self._program):
+            if address in self._removed:
+                continue
+
+            if opcode.type == OPCodeType.BEGIN_SCOPE:
+                opened_scopes.append(address)
+            elif opcode.type == OPCodeType.END_SCOPE:
+                begin_address = opened_scopes.pop()
+                is_function_body = begin_address > 0 and self._program[begin_address - 1].type == OPCodeType.FUNCTION
+
+                if not is_function_body and begin_address not in scopes_with_locals:
+                    self._removed.update((begin_address, address))
+                    self._stats.removed_scope_pairs += 1
+            elif opcode.type == OPCodeType.DECLARE_LOCAL and opened_scopes:
+                scopes_with_locals.add(opened_scopes[-1])
+
+    def _remove_jumps_to_next_instruction(self):
+        for address, opcode in enumerate(self._program):
+            if address in self._removed or opcode.type != OPCodeType.JUMP or opcode.first_arg <= address:
+                continue
+
+            if all(skipped_address in self._removed for skipped_address in range(address + 1, opcode.first_arg)):
+                self._removed.add(address)
+                self._stats.removed_jumps += 1
+
+    def _relocate(self) -> List[OPCode]:
+        # Address of the removed instruction is mapped to the address of the next kept one
+        relocated_addresses = []
+        kept_count = 0
+
+        for address in range(len(self._program) + 1):
+            relocated_addresses.append(kept_count)
+
+            if address < len(self._program) and address not in self._removed:
+                kept_count += 1
+
+        program = []
+
+        for address, opcode in enumerate(self._program):
+            if address in self._removed:
+                continue
+
+            if opcode.type in JUMP_ADDRESS_ARGS:
+                arg_index = JUMP_ADDRESS_ARGS[opcode.type]
+                opcode.args[arg_index] = relocated_addresses[opcode.args[arg_index]]
+
+            program.append(opcode)
+
+        return program
@@ -1,17 +1,87 @@
-from typing import List
+from enum import Enum, auto
+from typing import List, Optional
 
-from compiler.ast.builder import ASTBuilder
+from compiler.ast.ast_nodes.node import ASTNode
+from compiler.ast.fast_parser import FastParser
+from compiler.ast.inliner import FunctionsInliner
+from compiler.exceptions.common import CompilerError
+from compiler.opcodes.cache import BytecodeCache
 from compiler.opcodes.context import OPCodesCompilationContext
+from compiler.opcodes.optimizer import OPCodesOptimizer, OptimizationStats
 from vm.opcodes.opcodes import OPCode
 
+# Should be changed whenever the generated code changes, so cached programs of the previous versions are not used
+COMPILER_VERSION = "4"
+
+
+class ParserType(Enum):
+    # Parses the program with the ANTLR generated parser and transforms the parse tree to the AST
+    ANTLR = auto()
+
+    # Builds the AST directly from the ANTLR parse tree in one pass without the intermediate parse nodes
+    ANTLR_VISITOR = auto()
+
+    # Builds the AST directly by the hand-written parser
+    FAST = auto()
+
 
 class OPCodesCompiler:
     @staticmethod
-    def compile(raw_program_text: str) -> List[OPCode]:
-        builder = ASTBuilder(raw_program_text)
+    def create_cache(cache_directory: str) -> BytecodeCache:
+        return BytecodeCache(cache_directory, COMPILER_VERSION)
+
+    @staticmethod
+    def parse(raw_program_text: str, parser_type: ParserType = ParserType.ANTLR) -> ASTNode:
+        if parser_type == ParserType.FAST:
+            return FastParser(raw_program_text).parse()
+        elif parser_type == ParserType.ANTLR:
+            # ANTLR runtime is imported on demand, so the fast parser can be used without it
+            from compiler.ast.builder import ASTBuilder
+
+            return ASTBuilder(raw_program_text).get_tree()
+        elif parser_type == ParserType.ANTLR_VISITOR:
+            from compiler.ast.parse import parse_script
+            from compiler.ast.visitor import ASTBuildingVisitor
+
+            return ASTBuildingVisitor().visit(parse_script(raw_program_text))
+
+        raise CompilerError("Unknown parser type: {}".format(parser_type))
+
+    @staticmethod
+    def compile(raw_program_text: str, optimize: bool = True,
+                optimization_stats: Optional[OptimizationStats] = None,
+                cache: Optional[BytecodeCache] = None,
+                parser_type: ParserType = ParserType.ANTLR,
+                inlining_budget: int = 0) -> List[OPCode]:
+        # Calls of the small functions are inlined only if the inlining budget is set for the optimized compilation
+        if cache is not None:
+            cache_key = cache.get_key(raw_program_text, optimize, inlining_budget)
+            program = cache.load(cache_key, optimization_stats)
+
+            if program is None:
+                # Stats of this compilation only are stored with the entry, so they are reported on the cache hits
+                entry_stats = OptimizationStats()
+                program = OPCodesCompiler.compile(raw_program_text, optimize, entry_stats,
+                                                  parser_type=parser_type, inlining_budget=inlining_budget)
+                cache.store(cache_key, program, entry_stats)
+
+                if optimization_stats is not None:
+                    optimization_stats.add(entry_stats.counters)
+
+            return program
+
+        ast_tree = OPCodesCompiler.parse(raw_program_text, parser_type)
+
+        if optimize:
+            if inlining_budget > 0:
+                ast_tree = FunctionsInliner(inlining_budget, optimization_stats).inline(ast_tree)
+
+            ast_tree = ast_tree.optimize()
 
-        ast_tree = builder.get_tree()
         context = OPCodesCompilationContext()
         ast_tree.generate_opcodes(context)
 
+        if optimize:
+            return OPCodesOptimizer(context.program, optimization_stats).optimize()
+
         return context.program
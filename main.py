@@ -2,6 +2,7 @@ import astpretty
 
 from compiler.ast.ast_nodes.printer import print_tree, pformat
 from compiler.ast.builder import ASTBuilder
+from compiler.opcodes.optimizer import OptimizationStats
 from compiler.opcodes_compiler import OPCodesCompiler
 from utils.files import read_all_text, write_all_text
 from vm.opcodes.IO import OPCodesIO
@@ -14,8 +15,11 @@ def main():
     print_tree(builder.get_tree())
     # write_all_text("./tests/test_ast.txt", pformat(builder.get_tree()))
 
-    bytecode = OPCodesCompiler.compile(read_all_text('./tests/test.lua'))
+    optimization_stats = OptimizationStats()
+    bytecode = OPCodesCompiler.compile(read_all_text('./tests/test.lua'), optimization_stats=optimization_stats,
+                                       cache=OPCodesCompiler.create_cache('./.bytecode_cache'))
     print(OPCodesIO.get_program_text(bytecode))
+    print(optimization_stats.report)
     # write_all_text("./tests/test_bytecode.txt", OPCodesIO.get_program_text(bytecode))
 
     virtual_machine = VirtualMachine(bytecode)
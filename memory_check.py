@@ -0,0 +1,103 @@
+import argparse
+import contextlib
+import io
+import sys
+import tracemalloc
+from typing import List
+
+from benchmark import BENCHMARK_CONFIGURATIONS
+from compiler.opcodes_compiler import OPCodesCompiler, ParserType
+from vm.opcodes.array_program import ArrayProgram
+from vm.opcodes.opcodes import OPCode
+from vm.vm import VirtualMachine
+
+# Long-running loop which enters the scopes, declares and calls functions on every iteration, memory used
+# by the program should not depend on the number of iterations
+MEMORY_CHECK_PROGRAM = '''
+function step(value)
+    if value > 10 then
+        local doubled = value * 2
+        return doubled
+    end
+
+    return value
+end
+
+local total = 0
+
+for i = 1, {iterations} do
+    function identity(value)
+        return value
+    end
+
+    if i > 5 then
+        local current = step(i)
+        total = total + identity(current)
+    else
+        total = total + 1
+    end
+end
+
+print(total)
+'''
+
+MEMORY_CHECK_ITERATIONS = 1000000
+MEMORY_CHECK_LIMIT = 2 ** 20
+
+
+def measure_peak_memory(bytecode: List[OPCode], array_program: bool = False, **vm_options) -> int:
+    program = ArrayProgram.from_opcodes(bytecode) if array_program else bytecode
+
+    virtual_machine = VirtualMachine(program, **vm_options)
+    virtual_machine.load_standard_library()
+
+    tracemalloc.start()
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            virtual_machine.run()
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak_memory
+
+
+def check_memory_stability(iterations: int) -> bool:
+    # Program is compiled without optimizations, so all its scopes are kept
+    bytecode = OPCodesCompiler.compile(MEMORY_CHECK_PROGRAM.format(iterations=iterations), optimize=False,
+                                       parser_type=ParserType.FAST)
+    succeeded = True
+
+    print("{:<20} {:>16}  (limit: {} bytes)".format("configuration", "peak memory, B", MEMORY_CHECK_LIMIT))
+
+    for name, vm_options in BENCHMARK_CONFIGURATIONS:
+        try:
+            peak_memory = measure_peak_memory(bytecode, **vm_options)
+        except (RecursionError, MemoryError) as error:
+            # Leaked scopes make the names lookup recursion too deep, so the error is reported as the failure
+            print("{:<20} {:>16}  FAILED: {!r}".format(name, "-", error))
+            succeeded = False
+            continue
+
+        if peak_memory > MEMORY_CHECK_LIMIT:
+            print("{:<20} {:>16}  FAILED".format(name, peak_memory))
+            succeeded = False
+        else:
+            print("{:<20} {:>16}  OK".format(name, peak_memory))
+
+    return succeeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks that memory does not grow during the long-running loop "
+                                                 "for every execution engine configuration")
+    parser.add_argument("--iterations", type=int, default=MEMORY_CHECK_ITERATIONS, help="number of loop iterations")
+    args = parser.parse_args()
+
+    sys.exit(0 if check_memory_stability(args.iterations) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+import operator
+from typing import Callable, Dict, List, Optional
+
+from vm.exceptions.common import VirtualMachineInvalidInstructionError
+from vm.opcodes.array_program import ArrayProgram, OPERANDS_PER_INSTRUCTION
+from vm.opcodes.opcodes import OPCode, OPCodeType, FUSED_COMPARISON_JUMPS
+from vm.runtime.comparisons import VALUE_COMPARISONS
+from vm.runtime.context import ExecutionContext
+from vm.runtime.loops import prepare_numeric_loop, advance_numeric_loop
+from vm.runtime.value import BooleanValue, NumberValue
+
+# Instruction handler receives address of the instruction and returns address of the next one
+ArrayInstructionHandler = Callable[[int], int]
+
+_BINARY_OPERATIONS = {
+    OPCodeType.MULTIPLY: operator.mul,
+    OPCodeType.SUM: operator.add,
+    OPCodeType.SUBTRACT: operator.sub,
+    OPCodeType.DIVIDE: operator.truediv,
+    OPCodeType.BOOLEAN_AND: lambda left, right: left.boolean_and(right),
+    OPCodeType.BOOLEAN_OR: lambda left, right: left.boolean_or(right),
+    OPCodeType.CONCAT: lambda left, right: left.concat(right),
+    **VALUE_COMPARISONS,
+}
+
+
+# Interprets the array-backed program directly: handlers are created once per opcode type and read operands
+# from the program arrays, so no objects are created per instruction
+class ArrayEngine:
+    def __init__(self, context: ExecutionContext, handlers: Dict[OPCodeType, Callable]):
+        if not isinstance(context.code, ArrayProgram):
+            raise VirtualMachineInvalidInstructionError("Array engine runs array-backed programs only")
+
+        self._context = context
+        self._handlers = handlers
+        self._program: ArrayProgram = context.code
+        self._fallback_instructions: Dict[int, OPCode] = {}
+
+        max_opcode_value = max(opcode_type.value for opcode_type in OPCodeType)
+        self._array_handlers: List[Optional[ArrayInstructionHandler]] = [None] * (max_opcode_value + 1)
+
+        for opcode_type in OPCodeType:
+            self._array_handlers[opcode_type.value] = self._create_handler(opcode_type)
+
+    def run(self):
+        opcodes = self._program.opcodes
+        array_handlers = self._array_handlers
+        context = self._context
+        end_address = len(opcodes)
+
+        address = context.instruction_address
+
+        while address != end_address:
+            address = array_handlers[opcodes[address]](address)
+
+        context.perform_jump(address)
+
+    def _create_handler(self, opcode_type: OPCodeType) -> ArrayInstructionHandler:
+        context = self._context
+        operands = self._program.operands
+        constants = self._program.constants
+        stack = context.values_stack
+        push = stack.append
+        pop = stack.pop
+
+        if opcode_type == OPCodeType.PUSH_CONST:
+            def push_const(address):
+                push(constants[operands[address * OPERANDS_PER_INSTRUCTION]])
+                return address + 1
+
+            return push_const
+        elif opcode_type == OPCodeType.PUSH_VARIABLE:
+            inline_caches = context.inline_caches
+
+            def push_variable(address):
+                push(context.load_variable(constants[operands[address * OPERANDS_PER_INSTRUCTION]],
+                                           inline_caches[address]))
+                return address + 1
+
+            return push_variable
+        elif opcode_type == OPCodeType.POP:
+            def pop_value(address):
+                pop()
+                return address + 1
+
+            return pop_value
+        elif opcode_type == OPCodeType.LOAD_LOCAL:
+            def load_local(address):
+                push(context.current_call_context.locals[operands[address * OPERANDS_PER_INSTRUCTION]])
+                return address + 1
+
+            return load_local
+        elif opcode_type == OPCodeType.STORE_LOCAL:
+            def store_local(address):
+                context.current_call_context.locals[operands[address * OPERANDS_PER_INSTRUCTION]] = pop()
+                return address + 1
+
+            return store_local
+        elif opcode_type in _BINARY_OPERATIONS:
+            operation = _BINARY_OPERATIONS[opcode_type]
+
+            def binary_operation(address):
+                right = pop()
+                push(operation(pop(), right))
+                return address + 1
+
+            return binary_operation
+        elif opcode_type == OPCodeType.JUMP:
+            def jump(address):
+                return operands[address * OPERANDS_PER_INSTRUCTION]
+
+            return jump
+        elif opcode_type in (OPCodeType.JUMP_NEG, OPCodeType.JUMP_POS):
+            expected_result = opcode_type == OPCodeType.JUMP_POS
+
+            def conditional_jump(address):
+                comparison_result = pop()
+
+                if type(comparison_result) is not BooleanValue:
+                    raise VirtualMachineInvalidInstructionError(
+                        "Impossible to perform conditional jump: value on stack top is not boolean")
+
+                if comparison_result.value is expected_result:
+                    return operands[address * OPERANDS_PER_INSTRUCTION]
+
+                return address + 1
+
+            return conditional_jump
+        elif opcode_type in FUSED_COMPARISON_JUMPS:
+            comparison_type, expected_result = FUSED_COMPARISON_JUMPS[opcode_type]
+            compare = _BINARY_OPERATIONS[comparison_type]
+
+            def comparison_jump(address):
+                right = pop()
+                comparison_result = compare(pop(), right)
+
+                if type(comparison_result) is not BooleanValue:
+                    raise VirtualMachineInvalidInstructionError(
+                        "Impossible to perform conditional jump: comparison result is not boolean")
+
+                if comparison_result.value is expected_result:
+                    return operands[address * OPERANDS_PER_INSTRUCTION]
+
+                return address + 1
+
+            return comparison_jump
+        elif opcode_type == OPCodeType.FORPREP:
+            def forprep(address):
+                operands_index = address * OPERANDS_PER_INSTRUCTION
+                step = pop()
+                limit = pop()
+                counter = prepare_numeric_loop(context.current_call_context.locals, operands[operands_index],
+                                               pop(), limit, step)
+
+                if counter is None:
+                    return operands[operands_index + 1]
+
+                push(NumberValue.of(counter))
+                return address + 1
+
+            return forprep
+        elif opcode_type == OPCodeType.FORLOOP:
+            def forloop(address):
+                operands_index = address * OPERANDS_PER_INSTRUCTION
+                counter = advance_numeric_loop(context.current_call_context.locals, operands[operands_index])
+
+                if counter is None:
+                    return address + 1
+
+                push(NumberValue.of(counter))
+                return operands[operands_index + 1]
+
+            return forloop
+
+        return self._create_fallback_handler(opcode_type)
+
+    def _create_fallback_handler(self, opcode_type: OPCodeType) -> ArrayInstructionHandler:
+        # Instructions without specialized implementation (calls, scopes, declarations) are delegated
+        # to the interpreter handlers, their opcodes objects are decoded once on the first execution
+        context = self._context
+        program = self._program
+        fallback_instructions = self._fallback_instructions
+        handler = self._handlers.get(opcode_type)
+
+        if handler is None:
+            def invalid_instruction(address):
+                raise VirtualMachineInvalidInstructionError(
+                    "Invalid instruction: {} at address {}".format(program[address], address))
+
+            return invalid_instruction
+
+        def interpret(address):
+            instruction = fallback_instructions.get(address)
+
+            if instruction is None or instruction.type is not opcode_type:
+                instruction = program[address]
+                fallback_instructions[address] = instruction
+
+            context.perform_jump(address + 1)
+            handler(instruction)
+            return context.instruction_address
+
+        return interpret
@@ -0,0 +1,311 @@
+import operator
+from typing import List, Callable, Dict
+
+from vm.exceptions.common import VirtualMachineInvalidInstructionError
+from vm.opcodes.opcodes import OPCode, OPCodeType, FUSED_COMPARISON_JUMPS
+from vm.runtime.calls import adjust_builtin_results
+from vm.runtime.comparisons import VALUE_COMPARISONS
+from vm.runtime.context import ExecutionContext
+from vm.runtime.loops import prepare_numeric_loop, advance_numeric_loop
+from vm.runtime.unboxed import UNBOXED_BINARY_OPERATIONS, box, unbox, unboxed_boolean_not, unboxed_minus
+from vm.runtime.value import BooleanValue, NumberValue, NIL, BuiltinFunctionValue, CustomFunctionValue
+
+# Compiled instruction receives the execution context and returns address of the next instruction
+CompiledInstruction = Callable[[ExecutionContext], int]
+
+_BINARY_OPERATIONS = {
+    OPCodeType.MULTIPLY: operator.mul,
+    OPCodeType.SUM: operator.add,
+    OPCodeType.SUBTRACT: operator.sub,
+    OPCodeType.DIVIDE: operator.truediv,
+    OPCodeType.BOOLEAN_AND: lambda left, right: left.boolean_and(right),
+    OPCodeType.BOOLEAN_OR: lambda left, right: left.boolean_or(right),
+    OPCodeType.CONCAT: lambda left, right: left.concat(right),
+    **VALUE_COMPARISONS,
+}
+
+
+class ClosuresEngine:
+    def __init__(self, context: ExecutionContext, handlers: Dict[OPCodeType, Callable], unboxed_values: bool = False):
+        self._context = context
+        self._handlers = handlers
+        self._unboxed_values = unboxed_values
+        self._binary_operations = UNBOXED_BINARY_OPERATIONS if unboxed_values else _BINARY_OPERATIONS
+        self._boolean_type = bool if unboxed_values else BooleanValue
+        self._box_counter = float if unboxed_values else NumberValue.of
+        self._code: List[CompiledInstruction] = [self._compile_instruction(address, instruction)
+                                                 for address, instruction in enumerate(context.code)]
+
+    def run(self):
+        code = self._code
+        context = self._context
+        end_address = len(code)
+
+        address = context.instruction_address
+
+        while address != end_address:
+            address = code[address](context)
+
+        context.perform_jump(address)
+
+    def _compile_instruction(self, address: int, instruction: OPCode) -> CompiledInstruction:
+        next_address = address + 1
+        stack = self._context.values_stack
+        push = stack.append
+        pop = stack.pop
+
+        if instruction.type == OPCodeType.PUSH_CONST:
+            value = unbox(instruction.first_arg) if self._unboxed_values else instruction.first_arg
+
+            def push_const(context):
+                push(value)
+                return next_address
+
+            return push_const
+        elif instruction.type == OPCodeType.PUSH_VARIABLE:
+            name = instruction.first_arg
+            cache = self._context.inline_caches[address]
+
+            def push_variable(context):
+                push(context.load_variable(name, cache))
+                return next_address
+
+            return push_variable
+        elif instruction.type == OPCodeType.POP:
+            def pop_value(context):
+                pop()
+                return next_address
+
+            return pop_value
+        elif instruction.type in self._binary_operations:
+            operation = self._binary_operations[instruction.type]
+
+            def binary_operation(context):
+                right = pop()
+                push(operation(pop(), right))
+                return next_address
+
+            return binary_operation
+        elif instruction.type == OPCodeType.JUMP:
+            jump_address = instruction.first_arg
+
+            def jump(context):
+                return jump_address
+
+            return jump
+        elif instruction.type in (OPCodeType.JUMP_NEG, OPCodeType.JUMP_POS):
+            jump_address = instruction.first_arg
+            expected_result = instruction.type == OPCodeType.JUMP_POS
+            boolean_type = self._boolean_type
+
+            def conditional_jump(context):
+                comparison_result = pop()
+
+                if type(comparison_result) is not boolean_type:
+                    raise VirtualMachineInvalidInstructionError(
+                        "Impossible to perform conditional jump: value on stack top is not boolean")
+
+                return jump_address if unbox(comparison_result) is expected_result else next_address
+
+            return conditional_jump
+        elif instruction.type in FUSED_COMPARISON_JUMPS:
+            jump_address = instruction.first_arg
+            comparison_type, expected_result = FUSED_COMPARISON_JUMPS[instruction.type]
+            compare = self._binary_operations[comparison_type]
+            boolean_type = self._boolean_type
+
+            def comparison_jump(context):
+                right = pop()
+                comparison_result = compare(pop(), right)
+
+                if type(comparison_result) is not boolean_type:
+                    raise VirtualMachineInvalidInstructionError(
+                        "Impossible to perform conditional jump: comparison result is not boolean")
+
+                return jump_address if unbox(comparison_result) is expected_result else next_address
+
+            return comparison_jump
+        elif instruction.type == OPCodeType.FORPREP:
+            loop_slot = instruction.first_arg
+            exit_address = instruction.second_arg
+            box_counter = self._box_counter
+
+            def forprep(context):
+                step = pop()
+                limit = pop()
+                counter = prepare_numeric_loop(context.current_call_context.locals, loop_slot, pop(), limit, step)
+
+                if counter is None:
+                    return exit_address
+
+                push(box_counter(counter))
+                return next_address
+
+            return forprep
+        elif instruction.type == OPCodeType.FORLOOP:
+            loop_slot = instruction.first_arg
+            loop_address = instruction.second_arg
+            box_counter = self._box_counter
+
+            def forloop(context):
+                counter = advance_numeric_loop(context.current_call_context.locals, loop_slot)
+
+                if counter is None:
+                    return next_address
+
+                push(box_counter(counter))
+                return loop_address
+
+            return forloop
+        elif instruction.type == OPCodeType.DECLARE_LOCAL:
+            name = instruction.first_arg
+
+            def declare_local(context):
+                context.current_scope.set_local_value(name, NIL)
+                return next_address
+
+            return declare_local
+        elif instruction.type == OPCodeType.ASSIGN:
+            name = instruction.first_arg
+
+            def assign(context):
+                context.current_scope.set_value(name, pop())
+                return next_address
+
+            return assign
+        elif instruction.type == OPCodeType.LOAD_LOCAL:
+            slot = instruction.first_arg
+
+            def load_local(context):
+                push(context.current_call_context.locals[slot])
+                return next_address
+
+            return load_local
+        elif instruction.type == OPCodeType.STORE_LOCAL:
+            slot = instruction.first_arg
+
+            def store_local(context):
+                context.current_call_context.locals[slot] = pop()
+                return next_address
+
+            return store_local
+        elif instruction.type == OPCodeType.BEGIN_SCOPE:
+            def begin_scope(context):
+                context.create_scope()
+                return next_address
+
+            return begin_scope
+        elif instruction.type == OPCodeType.END_SCOPE:
+            def end_scope(context):
+                context.destroy_scope()
+                return next_address
+
+            return end_scope
+        elif self._unboxed_values:
+            return self._compile_unboxed_instruction(address, instruction)
+        else:
+            return self._compile_fallback(address, instruction)
+
+    def _compile_unboxed_instruction(self, address: int, instruction: OPCode) -> CompiledInstruction:
+        # Handlers of the interpreter work with boxed values only, so instructions inspecting the values
+        # are specialized here while the rest are delegated to the interpreter as usual
+        next_address = address + 1
+        stack = self._context.values_stack
+        push = stack.append
+        pop = stack.pop
+
+        if instruction.type in (OPCodeType.BOOLEAN_NOT, OPCodeType.MINUS):
+            operation = unboxed_boolean_not if instruction.type == OPCodeType.BOOLEAN_NOT else unboxed_minus
+
+            def unary_operation(context):
+                push(operation(pop()))
+                return next_address
+
+            return unary_operation
+        elif instruction.type == OPCodeType.CALL:
+            args_count = instruction.first_arg
+            results_count = instruction.second_arg
+            cache = self._context.inline_caches[address]
+
+            def call(context):
+                callable_value = pop()
+
+                if callable_value is not cache.value:
+                    if isinstance(callable_value, BuiltinFunctionValue):
+                        cache.target = callable_value.function
+                    elif isinstance(callable_value, CustomFunctionValue):
+                        cache.target = None
+                    else:
+                        raise VirtualMachineInvalidInstructionError(
+                            "Impossible to call value '{}': it is not callable".format(callable_value))
+
+                    cache.value = callable_value
+
+                if cache.target is None:
+                    context.perform_jump(next_address)
+                    context.enter_to_call_context(callable_value, args_count, results_count)
+                    return context.instruction_address
+
+                # builtin functions receive and return boxed values
+                args = [box(arg) for arg in stack[len(stack) - args_count:]]
+                del stack[len(stack) - args_count:]
+
+                push(unbox(cache.target(*args)))
+
+                if results_count != 1:
+                    adjust_builtin_results(stack, results_count)
+
+                return next_address
+
+            return call
+        elif instruction.type == OPCodeType.TAILCALL:
+            args_count = instruction.first_arg
+            cache = self._context.inline_caches[address]
+
+            def tail_call(context):
+                callable_value = pop()
+
+                if callable_value is not cache.value:
+                    if isinstance(callable_value, BuiltinFunctionValue):
+                        cache.target = callable_value.function
+                    elif isinstance(callable_value, CustomFunctionValue):
+                        cache.target = None
+                    else:
+                        raise VirtualMachineInvalidInstructionError(
+                            "Impossible to call value '{}': it is not callable".format(callable_value))
+
+                    cache.value = callable_value
+
+                if cache.target is None:
+                    context.enter_to_tail_call_context(callable_value, args_count)
+                    return context.instruction_address
+
+                args = [box(arg) for arg in stack[len(stack) - args_count:]]
+                del stack[len(stack) - args_count:]
+
+                push(unbox(cache.target(*args)))
+                context.return_from_call_context(1)
+                return context.instruction_address
+
+            return tail_call
+        else:
+            return self._compile_fallback(address, instruction)
+
+    def _compile_fallback(self, address: int, instruction: OPCode) -> CompiledInstruction:
+        # Instructions without specialized implementation are delegated to the interpreter handlers
+        next_address = address + 1
+        handler = self._handlers.get(instruction.type)
+
+        if handler is None:
+            def invalid_instruction(context):
+                raise VirtualMachineInvalidInstructionError(
+                    "Invalid instruction: {} at address {}".format(instruction, address))
+
+            return invalid_instruction
+
+        def interpret(context):
+            context.perform_jump(next_address)
+            handler(instruction)
+            return context.instruction_address
+
+        return interpret
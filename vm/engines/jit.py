@@ -0,0 +1,419 @@
+from types import CodeType
+from typing import List, Dict, Callable, Set, Tuple, Optional
+
+from vm.exceptions.common import VirtualMachineInvalidInstructionError
+from vm.opcodes.opcodes import OPCode, OPCodeType, FUSED_COMPARISON_JUMPS, JUMP_ADDRESS_ARGS
+from vm.runtime.calls import adjust_builtin_results
+from vm.runtime.context import ExecutionContext
+from vm.runtime.inline_cache import InlineCache
+from vm.runtime.loops import prepare_numeric_loop
+from vm.runtime.quickening import GENERIC_OPCODES
+from vm.runtime.value import NumberValue, BooleanValue, NIL, BuiltinFunctionValue, CustomFunctionValue
+
+# Returned by the compiled function when some type guard has failed and execution is passed to the interpreter
+DEOPTIMIZED = object()
+
+_ARITHMETIC_OPERATORS = {
+    OPCodeType.SUM: "+",
+    OPCodeType.SUBTRACT: "-",
+    OPCodeType.MULTIPLY: "*",
+    OPCodeType.DIVIDE: "/",
+}
+
+_GENERIC_BINARY_OPERATIONS = {
+    OPCodeType.BOOLEAN_AND: "left.boolean_and(right)",
+    OPCodeType.BOOLEAN_OR: "left.boolean_or(right)",
+    OPCodeType.CMP_GT: "left.__gt__(right)",
+    OPCodeType.CMP_EQ: "left.__eq__(right)",
+    OPCodeType.CMP_GE: "left.__ge__(right)",
+    OPCodeType.CMP_LE: "left.__le__(right)",
+    OPCodeType.CMP_LT: "left.__lt__(right)",
+    OPCodeType.CMP_NE: "left.__ne__(right)",
+    OPCodeType.CONCAT: "left.concat(right)",
+}
+
+
+# Comparisons of the raw numbers, ordering follows the semantics of NumberValue.__lt__ and its derivatives
+_NUMBER_COMPARISONS = {
+    OPCodeType.CMP_EQ: "{} == {}",
+    OPCodeType.CMP_NE: "{} != {}",
+    OPCodeType.CMP_LT: "{} <= {}",
+    OPCodeType.CMP_GT: "not {} <= {}",
+    OPCodeType.CMP_LE: "{} <= {}",
+    OPCodeType.CMP_GE: "not {} <= {}",
+}
+
+
+class JITCompilationError(RuntimeError):
+    pass
+
+
+class FunctionTranslator:
+    def __init__(self, code: List[OPCode], inline_caches: List[Optional[InlineCache]], function_address: int,
+                 handlers: Dict[OPCodeType, Callable]):
+        self._code = code
+        self._inline_caches = inline_caches
+        self._function_address = function_address
+        self._handlers = handlers
+        self._namespace = {
+            "NumberValue": NumberValue,
+            "BooleanValue": BooleanValue,
+            "NIL": NIL,
+            "BuiltinFunctionValue": BuiltinFunctionValue,
+            "DEOPTIMIZED": DEOPTIMIZED,
+            "prepare_numeric_loop": prepare_numeric_loop,
+            "adjust_builtin_results": adjust_builtin_results,
+            "VirtualMachineInvalidInstructionError": VirtualMachineInvalidInstructionError,
+        }
+        self._addresses: List[int] = []
+        self._leaders: Set[int] = set()
+        self._resume_addresses: List[int] = []
+
+    @property
+    def namespace(self) -> Dict:
+        return self._namespace
+
+    @property
+    def resume_addresses(self) -> List[int]:
+        return self._resume_addresses
+
+    def translate(self) -> str:
+        self._collect_function_addresses()
+        self._collect_leaders()
+
+        lines = [
+            "def jit_function(context, address):",
+            "    stack = context.values_stack",
+            "    push = stack.append",
+            "    pop = stack.pop",
+            "    frame_locals = context.current_call_context.locals",
+            "    while True:",
+        ]
+
+        for index, address in enumerate(self._addresses):
+            if address in self._leaders:
+                lines.append("        {} address == {}:".format("if" if index == 0 else "elif", address))
+
+            for line in self._translate_instruction(address):
+                lines.append("            " + line)
+
+            next_address = self._addresses[index + 1] if index + 1 < len(self._addresses) else None
+
+            if next_address is None or next_address != address + 1 or next_address in self._leaders:
+                lines.extend("            " + line for line in self._translate_block_end(address))
+
+        lines.extend([
+            "        else:",
+            "            raise VirtualMachineInvalidInstructionError(",
+            "                'Address {} is not an entry of the compiled function'.format(address))",
+        ])
+
+        return "\n".join(lines) + "\n"
+
+    def _collect_function_addresses(self):
+        # Collects addresses of the function body skipping bodies of the nested functions declarations
+        declaration = self._code[self._function_address - 1] if self._function_address > 0 else None
+
+        if declaration is None or declaration.type != OPCodeType.DECLARE_FUNCTION:
+            raise JITCompilationError("Function body must follow after function declaration")
+
+        address = self._function_address
+
+        while address <= declaration.third_arg:
+            self._addresses.append(address)
+
+            if self._code[address].type == OPCodeType.DECLARE_FUNCTION:
+                address = self._code[address].third_arg
+
+            address += 1
+
+    def _collect_leaders(self):
+        addresses = set(self._addresses)
+        self._leaders.add(self._function_address)
+
+        for address in self._addresses:
+            instruction = self._code[address]
+
+            if instruction.type in JUMP_ADDRESS_ARGS:
+                jump_address = instruction.get_arg(JUMP_ADDRESS_ARGS[instruction.type])
+
+                if jump_address not in addresses:
+                    raise JITCompilationError("Jump to address {} leaves the function body".format(jump_address))
+
+                self._leaders.add(jump_address)
+            elif instruction.type == OPCodeType.CALL:
+                if address + 1 in addresses:
+                    self._leaders.add(address + 1)
+                    self._resume_addresses.append(address + 1)
+            elif instruction.type == OPCodeType.DECLARE_FUNCTION:
+                if instruction.third_arg + 1 in addresses:
+                    self._leaders.add(instruction.third_arg + 1)
+
+    def _translate_block_end(self, address: int) -> List[str]:
+        instruction_type = self._code[address].type
+
+        if instruction_type in (OPCodeType.JUMP, OPCodeType.RETURN, OPCodeType.TAILCALL):
+            return []
+
+        continuation_address = self._continuation_address(address)
+
+        if continuation_address not in self._leaders:
+            # Control leaves the translated range, e.g. after the last instruction of the function
+            return self._exit_to_interpreter(continuation_address)
+
+        return ["address = {}".format(continuation_address)]
+
+    def _continuation_address(self, address: int) -> int:
+        if self._code[address].type == OPCodeType.DECLARE_FUNCTION:
+            return self._code[address].third_arg + 1
+
+        return address + 1
+
+    @staticmethod
+    def _exit_to_interpreter(address: int, result: str = "None") -> List[str]:
+        return [
+            "context.perform_jump({})".format(address),
+            "return {}".format(result),
+        ]
+
+    @staticmethod
+    def _emit_builtin_call(function: str, args_count: int) -> List[str]:
+        # Arguments are read right from the stack and the call result takes place of the first one
+        if args_count == 0:
+            return ["push({}())".format(function)]
+
+        args = ", ".join("stack[-{}]".format(index) for index in range(args_count, 0, -1))
+        lines = ["call_result = {}({})".format(function, args)]
+
+        if args_count > 1:
+            lines.append("del stack[-{}:]".format(args_count - 1))
+
+        lines.append("stack[-1] = call_result")
+
+        return lines
+
+    @staticmethod
+    def _emit_builtin_results_adjustment(results_count: int) -> List[str]:
+        if results_count == 1:
+            return []
+
+        return ["adjust_builtin_results(stack, {})".format(results_count)]
+
+    def _bind(self, prefix: str, address: int, value) -> str:
+        name = "{}{}".format(prefix, address)
+        self._namespace[name] = value
+
+        return name
+
+    def _translate_instruction(self, address: int) -> List[str]:
+        instruction = self._code[address]
+        instruction_type = GENERIC_OPCODES.get(instruction.type, instruction.type)
+
+        if instruction_type == OPCodeType.PUSH_CONST:
+            return ["push({})".format(self._bind("constant_", address, instruction.first_arg))]
+        elif instruction_type == OPCodeType.PUSH_VARIABLE:
+            cache = self._bind("cache_", address, self._inline_caches[address])
+
+            return ["push(context.load_variable({!r}, {}))".format(instruction.first_arg, cache)]
+        elif instruction_type == OPCodeType.POP:
+            return ["pop()"]
+        elif instruction_type in _ARITHMETIC_OPERATORS:
+            return [
+                "right = pop()",
+                "left = pop()",
+                "if type(left) is not NumberValue or type(right) is not NumberValue:",
+                "    push(left)",
+                "    push(right)",
+                *("    " + line for line in self._exit_to_interpreter(address, "DEOPTIMIZED")),
+                "push(NumberValue.of(left.value {} right.value))".format(_ARITHMETIC_OPERATORS[instruction_type]),
+            ]
+        elif instruction_type in _GENERIC_BINARY_OPERATIONS:
+            return [
+                "right = pop()",
+                "left = pop()",
+                "push({})".format(_GENERIC_BINARY_OPERATIONS[instruction_type]),
+            ]
+        elif instruction_type == OPCodeType.MINUS:
+            return ["push(-pop())"]
+        elif instruction_type == OPCodeType.BOOLEAN_NOT:
+            return ["push(pop().boolean_not())"]
+        elif instruction_type == OPCodeType.JUMP:
+            return ["address = {}".format(instruction.first_arg), "continue"]
+        elif instruction_type in (OPCodeType.JUMP_NEG, OPCodeType.JUMP_POS):
+            return [
+                "value = pop()",
+                "if type(value) is not BooleanValue:",
+                "    push(value)",
+                *("    " + line for line in self._exit_to_interpreter(address, "DEOPTIMIZED")),
+                "if value.value is {}:".format(instruction_type == OPCodeType.JUMP_POS),
+                "    address = {}".format(instruction.first_arg),
+                "    continue",
+            ]
+        elif instruction_type in FUSED_COMPARISON_JUMPS:
+            comparison_type, expected_result = FUSED_COMPARISON_JUMPS[instruction_type]
+
+            return [
+                "right = pop()",
+                "left = pop()",
+                "if type(left) is NumberValue and type(right) is NumberValue:",
+                "    value = {}".format(_NUMBER_COMPARISONS[comparison_type].format("left.value", "right.value")),
+                "else:",
+                "    value = {}".format(_GENERIC_BINARY_OPERATIONS[comparison_type]),
+                "    if type(value) is not BooleanValue:",
+                "        push(left)",
+                "        push(right)",
+                *("        " + line for line in self._exit_to_interpreter(address, "DEOPTIMIZED")),
+                "    value = value.value",
+                "if value is {}:".format(expected_result),
+                "    address = {}".format(instruction.first_arg),
+                "    continue",
+            ]
+        elif instruction_type == OPCodeType.FORPREP:
+            return [
+                "step = pop()",
+                "limit = pop()",
+                "counter = prepare_numeric_loop(frame_locals, {}, pop(), limit, step)".format(instruction.first_arg),
+                "if counter is None:",
+                "    address = {}".format(instruction.second_arg),
+                "    continue",
+                "push(NumberValue.of(counter))",
+            ]
+        elif instruction_type == OPCodeType.FORLOOP:
+            loop_slot = instruction.first_arg
+
+            return [
+                "step = frame_locals[{}]".format(loop_slot + 2),
+                "counter = frame_locals[{}] + step".format(loop_slot),
+                "if counter <= frame_locals[{0}] if step > 0 else counter >= frame_locals[{0}]:".format(loop_slot + 1),
+                "    frame_locals[{}] = counter".format(loop_slot),
+                "    push(NumberValue.of(counter))",
+                "    address = {}".format(instruction.second_arg),
+                "    continue",
+            ]
+        elif instruction_type == OPCodeType.DECLARE_LOCAL:
+            return ["context.current_scope.set_local_value({!r}, NIL)".format(instruction.first_arg)]
+        elif instruction_type == OPCodeType.ASSIGN:
+            return ["context.current_scope.set_value({!r}, pop())".format(instruction.first_arg)]
+        elif instruction_type == OPCodeType.LOAD_LOCAL:
+            return ["push(frame_locals[{}])".format(instruction.first_arg)]
+        elif instruction_type == OPCodeType.STORE_LOCAL:
+            return ["frame_locals[{}] = pop()".format(instruction.first_arg)]
+        elif instruction_type == OPCodeType.BEGIN_SCOPE:
+            return ["context.create_scope()"]
+        elif instruction_type == OPCodeType.END_SCOPE:
+            return ["context.destroy_scope()"]
+        elif instruction_type == OPCodeType.CALL:
+            args_count = instruction.first_arg
+            cache = self._bind("cache_", address, self._inline_caches[address])
+
+            return [
+                "callable_value = pop()",
+                "if callable_value is not {0}.value or {0}.target is None:".format(cache),
+                "    if type(callable_value) is not BuiltinFunctionValue:",
+                "        push(callable_value)",
+                *("        " + line for line in self._exit_to_interpreter(address)),
+                "    {0}.value = callable_value".format(cache),
+                "    {0}.target = callable_value.function".format(cache),
+                *self._emit_builtin_call("{}.target".format(cache), args_count),
+                *self._emit_builtin_results_adjustment(instruction.second_arg),
+            ]
+        elif instruction_type == OPCodeType.RETURN:
+            return ["context.return_from_call_context({})".format(instruction.first_arg), "return None"]
+        elif instruction_type == OPCodeType.DECLARE_FUNCTION:
+            # Declaration is delegated to the interpreter handler, which also skips the nested function body
+            handler = self._bind("handler_", address, self._handlers[instruction_type])
+            bound_instruction = self._bind("instruction_", address, instruction)
+
+            return [
+                "context.perform_jump({})".format(address + 1),
+                "{}({})".format(handler, bound_instruction),
+            ]
+        else:
+            # Unsupported instruction is executed by the interpreter together with the rest of the call
+            return self._exit_to_interpreter(address)
+
+
+class HotFunctionsJIT:
+    HOT_CALLS_THRESHOLD = 50
+    MAX_DEOPTIMIZATIONS = 16
+
+    # Code objects are shared between machines running the same bytecode
+    _code_objects_cache: Dict[str, CodeType] = {}
+
+    def __init__(self, context: ExecutionContext, handlers: Dict[OPCodeType, Callable]):
+        self._context = context
+        self._handlers = handlers
+        self._calls_counters: Dict[int, int] = {}
+        self._deoptimizations_counters: Dict[int, int] = {}
+        self._blacklisted_functions: Set[int] = set()
+        # Maps entry address to the compiled function and the address of the function it belongs to
+        self._entries: Dict[int, Tuple[Callable, int]] = {}
+        self._functions_entries: Dict[int, List[int]] = {}
+
+    def on_call(self, function: CustomFunctionValue):
+        function_address = function.instruction_address
+
+        if function_address not in self._entries and function_address not in self._blacklisted_functions:
+            calls_count = self._calls_counters.get(function_address, 0) + 1
+            self._calls_counters[function_address] = calls_count
+
+            if calls_count < self.HOT_CALLS_THRESHOLD or not self._compile_function(function_address):
+                return
+
+        self._execute()
+
+    def on_return(self):
+        if self._context.instruction_address in self._entries:
+            self._execute()
+
+    def _execute(self):
+        context = self._context
+        entry = self._entries.get(context.instruction_address)
+
+        while entry is not None:
+            compiled_function, function_address = entry
+
+            if compiled_function(context, context.instruction_address) is DEOPTIMIZED:
+                self._register_deoptimization(function_address)
+                return
+
+            entry = self._entries.get(context.instruction_address)
+
+    def _register_deoptimization(self, function_address: int):
+        deoptimizations_count = self._deoptimizations_counters.get(function_address, 0) + 1
+        self._deoptimizations_counters[function_address] = deoptimizations_count
+
+        if deoptimizations_count >= self.MAX_DEOPTIMIZATIONS:
+            for entry_address in self._functions_entries.pop(function_address):
+                del self._entries[entry_address]
+
+            self._blacklisted_functions.add(function_address)
+
+    def _compile_function(self, function_address: int) -> bool:
+        translator = FunctionTranslator(self._context.code, self._context.inline_caches, function_address,
+                                        self._handlers)
+
+        try:
+            source = translator.translate()
+        except JITCompilationError:
+            self._blacklisted_functions.add(function_address)
+            return False
+
+        code_object = self._code_objects_cache.get(source)
+
+        if code_object is None:
+            code_object = compile(source, "<jit function at {}>".format(function_address), "exec")
+            self._code_objects_cache[source] = code_object
+
+        namespace = translator.namespace
+        exec(code_object, namespace)
+        compiled_function = namespace["jit_function"]
+
+        entries_addresses = [function_address] + translator.resume_addresses
+
+        for entry_address in entries_addresses:
+            self._entries[entry_address] = (compiled_function, function_address)
+
+        self._functions_entries[function_address] = entries_addresses
+
+        return True
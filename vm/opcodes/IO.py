@@ -1,6 +1,7 @@
 from typing import List
 
 from vm.exceptions.common import OPCodeValidationError
+from vm.opcodes.binary import BinaryProgramWriter, MappedProgram
 from vm.opcodes.opcodes import OPCodeType, OPCode, OPCodesDefinitions
 from vm.opcodes.validator import OPCodesValidator
 
@@ -24,3 +25,62 @@ class OPCodesIO:
             line_index += 1
 
         return text
+
+    @staticmethod
+    def parse_program_text(text: str) -> List[OPCode]:
+        opcodes = []
+
+        for line in text.split("\n"):
+            if not line:
+                continue
+
+            line_index, separator, instruction = line.partition(":\t\t ")
+
+            if not separator or int(line_index) != len(opcodes):
+                raise OPCodeValidationError("Invalid program line: {}".format(line))
+
+            name, _, args_text = instruction.partition(" ")
+            opcode_type = OPCodesDefinitions.get_opcode_type(name)
+
+            if opcode_type is None:
+                raise OPCodeValidationError("Unknown opcode: {}".format(name))
+
+            args_definitions = OPCodesDefinitions.get_definition(opcode_type).args or []
+
+            # The last argument takes the rest of the line, so string literals with spaces are kept intact
+            raw_args = args_text.split(" ", len(args_definitions) - 1) if args_definitions else []
+            opcode = OPCode(opcode_type, [OPCodesIO._parse_arg(arg_definition.type, raw_arg)
+                                          for arg_definition, raw_arg in zip(args_definitions, raw_args)])
+
+            if not OPCodesValidator.is_opcode_valid(opcode):
+                raise OPCodeValidationError("Invalid program line: {}".format(line))
+
+            opcodes.append(opcode)
+
+        return opcodes
+
+    @staticmethod
+    def get_program_bytes(opcodes: List[OPCode]) -> bytes:
+        return BinaryProgramWriter().write(opcodes)
+
+    @staticmethod
+    def write_program_binary(path: str, opcodes: List[OPCode]):
+        with open(path, "wb") as program_file:
+            program_file.write(OPCodesIO.get_program_bytes(opcodes))
+
+    @staticmethod
+    def parse_program_bytes(data: bytes) -> MappedProgram:
+        return MappedProgram(data)
+
+    @staticmethod
+    def map_program_binary(path: str) -> MappedProgram:
+        return MappedProgram.open(path)
+
+    @staticmethod
+    def _parse_arg(arg_type, raw_arg: str):
+        if arg_type is int:
+            return int(raw_arg)
+        elif arg_type is str:
+            return raw_arg
+
+        raise OPCodeValidationError("Arguments of type {} can not be parsed".format(arg_type.__name__))
@@ -0,0 +1,115 @@
+from array import array
+from typing import List, Iterable, Iterator, Dict, Tuple
+
+from vm.exceptions.common import OPCodeValidationError
+from vm.opcodes.opcodes import OPCode, OPCodeType, OPCodesDefinitions
+
+# Every instruction has the fixed number of operands slots, so operands of the instruction at the given address
+# start from the index address * OPERANDS_PER_INSTRUCTION
+OPERANDS_PER_INSTRUCTION = 4
+
+_EMPTY_OPERANDS = array("i", (0,) * OPERANDS_PER_INSTRUCTION)
+
+_OPCODES_TYPES: Dict[int, OPCodeType] = {opcode_type.value: opcode_type for opcode_type in OPCodeType}
+
+
+def _get_constant_key(constant) -> Tuple:
+    # Values define '__eq__' as the language operation, so constants are deduplicated by the type and raw value
+    # (values without the raw one, e.g. nil, are singletons or compared by identity)
+    if type(constant) is str:
+        return str, constant
+
+    return type(constant), getattr(constant, "value", id(constant))
+
+
+# Compact program representation: opcodes numbers and operands are kept in the typed arrays, integer operands
+# are stored as is and the others (identifiers, literals and values) as indexes in the constants table
+class ArrayProgram:
+    def __init__(self, opcodes: array, operands: array, constants: List):
+        if len(operands) != len(opcodes) * OPERANDS_PER_INSTRUCTION:
+            raise OPCodeValidationError("Operands count does not match instructions count")
+
+        self._opcodes = opcodes
+        self._operands = operands
+        self._constants = constants
+        self._constants_indexes: Dict[Tuple, int] = {
+            _get_constant_key(constant): constant_index for constant_index, constant in enumerate(constants)
+        }
+
+    @classmethod
+    def from_opcodes(cls, opcodes: Iterable[OPCode]) -> "ArrayProgram":
+        program = cls(array("i"), array("i"), [])
+
+        for opcode in opcodes:
+            program.append(opcode)
+
+        return program
+
+    def to_opcodes(self) -> List[OPCode]:
+        return list(self)
+
+    @property
+    def opcodes(self) -> array:
+        return self._opcodes
+
+    @property
+    def operands(self) -> array:
+        return self._operands
+
+    @property
+    def constants(self) -> List:
+        return self._constants
+
+    def append(self, opcode: OPCode):
+        self._opcodes.append(0)
+        self._operands.extend((0,) * OPERANDS_PER_INSTRUCTION)
+        self[len(self._opcodes) - 1] = opcode
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+    def __getitem__(self, address: int) -> OPCode:
+        opcode_type = _OPCODES_TYPES[self._opcodes[address]]
+        operands_index = (address % len(self._opcodes)) * OPERANDS_PER_INSTRUCTION
+
+        args = []
+
+        for arg_index, arg_definition in enumerate(OPCodesDefinitions.get_definition(opcode_type).args or []):
+            operand = self._operands[operands_index + arg_index]
+            args.append(operand if arg_definition.type is int else self._constants[operand])
+
+        return OPCode(opcode_type, args)
+
+    def __setitem__(self, address: int, opcode: OPCode):
+        opcode_definition = OPCodesDefinitions.get_definition(opcode.type)
+
+        if opcode_definition is None or len(opcode.args) != len(opcode_definition.args or []):
+            raise OPCodeValidationError("Invalid opcode: {}".format(opcode))
+
+        operands_index = (address % len(self._opcodes)) * OPERANDS_PER_INSTRUCTION
+        self._operands[operands_index:operands_index + OPERANDS_PER_INSTRUCTION] = _EMPTY_OPERANDS
+
+        for arg_index, (arg_definition, arg) in enumerate(zip(opcode_definition.args or [], opcode.args)):
+            operand = arg if arg_definition.type is int else self._get_constant_index(arg)
+
+            try:
+                self._operands[operands_index + arg_index] = operand
+            except OverflowError:
+                raise OPCodeValidationError("Operands of {} are out of range".format(opcode))
+
+        self._opcodes[address] = opcode.type.value
+
+    def __iter__(self) -> Iterator[OPCode]:
+        for address in range(len(self._opcodes)):
+            yield self[address]
+
+    def _get_constant_index(self, constant) -> int:
+        constant_key = _get_constant_key(constant)
+        constant_index = self._constants_indexes.get(constant_key)
+
+        if constant_index is None:
+            constant_index = len(self._constants)
+            self._constants.append(constant)
+            self._constants_indexes[constant_key] = constant_index
+
+        return constant_index
@@ -0,0 +1,193 @@
+import mmap
+import struct
+from typing import List, Dict, Optional, Iterator, Union
+
+from vm.exceptions.common import OPCodeValidationError
+from vm.opcodes.opcodes import OPCode, OPCodeType, OPCodesDefinitions
+from vm.opcodes.validator import OPCodesValidator
+
+# Binary program layout (little-endian):
+#   header: magic, format version, reserved, constants count, instructions count, code section offset
+#   constants offsets table: absolute offset of every constant (u32 each)
+#   constants: length prefixed utf-8 strings (opcodes names, identifiers and literals, each stored once)
+#   code section: fixed-width instruction records (opcode name constant index and up to three operands),
+#   string operands are stored as the constants indexes and integer ones as is
+BINARY_PROGRAM_MAGIC = b"LVMB"
+BINARY_PROGRAM_FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<4sHHIII")
+_CONSTANT_OFFSET = struct.Struct("<I")
+_CONSTANT_LENGTH = struct.Struct("<I")
+_INSTRUCTION = struct.Struct("<iiii")
+_MAX_OPERANDS_COUNT = 3
+
+
+class BinaryProgramWriter:
+    def __init__(self):
+        self._constants: List[str] = []
+        self._constants_indexes: Dict[str, int] = {}
+
+    def write(self, opcodes: List[OPCode]) -> bytes:
+        instructions = [self._encode_instruction(opcode) for opcode in opcodes]
+
+        encoded_constants = [constant.encode("utf-8") for constant in self._constants]
+        constants_offset = _HEADER.size + _CONSTANT_OFFSET.size * len(encoded_constants)
+
+        constants_offsets = []
+        constants_data = bytearray()
+
+        for encoded_constant in encoded_constants:
+            constants_offsets.append(constants_offset + len(constants_data))
+            constants_data += _CONSTANT_LENGTH.pack(len(encoded_constant))
+            constants_data += encoded_constant
+
+        code_offset = constants_offset + len(constants_data)
+
+        data = bytearray(_HEADER.pack(BINARY_PROGRAM_MAGIC, BINARY_PROGRAM_FORMAT_VERSION, 0,
+                                      len(encoded_constants), len(instructions), code_offset))
+
+        for constant_offset in constants_offsets:
+            data += _CONSTANT_OFFSET.pack(constant_offset)
+
+        data += constants_data
+
+        for instruction in instructions:
+            data += instruction
+
+        return bytes(data)
+
+    def _get_constant_index(self, constant: str) -> int:
+        constant_index = self._constants_indexes.get(constant)
+
+        if constant_index is None:
+            constant_index = len(self._constants)
+            self._constants.append(constant)
+            self._constants_indexes[constant] = constant_index
+
+        return constant_index
+
+    def _encode_instruction(self, opcode: OPCode) -> bytes:
+        if not OPCodesValidator.is_opcode_valid(opcode):
+            raise OPCodeValidationError("Invalid opcode: {}".format(opcode))
+
+        opcode_definition = OPCodesDefinitions.get_definition(opcode.type)
+        operands = [0] * _MAX_OPERANDS_COUNT
+
+        for arg_index, arg in enumerate(opcode.args):
+            if type(arg) is str:
+                operands[arg_index] = self._get_constant_index(arg)
+            elif type(arg) is int:
+                operands[arg_index] = arg
+            else:
+                raise OPCodeValidationError("Arguments of type {} can not be serialized".format(type(arg).__name__))
+
+        try:
+            return _INSTRUCTION.pack(self._get_constant_index(opcode_definition.name), *operands)
+        except struct.error:
+            raise OPCodeValidationError("Operands of {} are out of range".format(opcode))
+
+
+# Read-only sequence of the instructions of the binary program: instructions are decoded on access,
+# so large programs are loaded without creating all opcodes objects up front
+class MappedProgram:
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        self._buffer = buffer
+
+        if len(buffer) < _HEADER.size:
+            raise OPCodeValidationError("Binary program is truncated")
+
+        magic, format_version, _, constants_count, instructions_count, code_offset = _HEADER.unpack_from(buffer, 0)
+
+        if magic != BINARY_PROGRAM_MAGIC:
+            raise OPCodeValidationError("Data is not a binary program")
+
+        if format_version != BINARY_PROGRAM_FORMAT_VERSION:
+            raise OPCodeValidationError("Unsupported binary program format version: {}".format(format_version))
+
+        if code_offset + instructions_count * _INSTRUCTION.size > len(buffer):
+            raise OPCodeValidationError("Binary program is truncated")
+
+        self._constants_count = constants_count
+        self._instructions_count = instructions_count
+        self._code_offset = code_offset
+        self._constants: List[Optional[str]] = [None] * constants_count
+        self._opcodes_types: Dict[int, OPCodeType] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "MappedProgram":
+        with open(path, "rb") as program_file:
+            return cls(mmap.mmap(program_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._instructions_count
+
+    def __getitem__(self, address: int) -> OPCode:
+        if address < 0:
+            address += self._instructions_count
+
+        if not 0 <= address < self._instructions_count:
+            raise IndexError("Instruction address is out of range")
+
+        return self._decode_instruction(address)
+
+    def __iter__(self) -> Iterator[OPCode]:
+        for address in range(self._instructions_count):
+            yield self._decode_instruction(address)
+
+    def get_constant(self, constant_index: int) -> str:
+        if not 0 <= constant_index < self._constants_count:
+            raise OPCodeValidationError("Constant index is out of range: {}".format(constant_index))
+
+        constant = self._constants[constant_index]
+
+        if constant is None:
+            constant_offset, = _CONSTANT_OFFSET.unpack_from(self._buffer, _HEADER.size +
+                                                            _CONSTANT_OFFSET.size * constant_index)
+            constant_length, = _CONSTANT_LENGTH.unpack_from(self._buffer, constant_offset)
+            constant_start = constant_offset + _CONSTANT_LENGTH.size
+            constant = bytes(self._buffer[constant_start:constant_start + constant_length]).decode("utf-8")
+
+            self._constants[constant_index] = constant
+
+        return constant
+
+    def _get_opcode_type(self, name_index: int) -> OPCodeType:
+        opcode_type = self._opcodes_types.get(name_index)
+
+        if opcode_type is None:
+            name = self.get_constant(name_index)
+            opcode_type = OPCodesDefinitions.get_opcode_type(name)
+
+            if opcode_type is None:
+                raise OPCodeValidationError("Unknown opcode: {}".format(name))
+
+            self._opcodes_types[name_index] = opcode_type
+
+        return opcode_type
+
+    def _decode_instruction(self, address: int) -> OPCode:
+        name_index, *operands = _INSTRUCTION.unpack_from(self._buffer, self._code_offset + address * _INSTRUCTION.size)
+        opcode_type = self._get_opcode_type(name_index)
+
+        args = []
+
+        for arg_definition, operand in zip(OPCodesDefinitions.get_definition(opcode_type).args or [], operands):
+            if arg_definition.type is str:
+                args.append(self.get_constant(operand))
+            elif arg_definition.type is int:
+                args.append(operand)
+            else:
+                raise OPCodeValidationError("Arguments of type {} can not be deserialized".format(
+                    arg_definition.type.__name__))
+
+        return OPCode(opcode_type, args)
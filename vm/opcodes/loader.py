@@ -0,0 +1,110 @@
+from typing import List, Optional, Dict, Sequence
+
+from vm.exceptions.common import VirtualMachineInvalidInstructionError, VirtualMachineScopeOrderError
+from vm.opcodes.array_program import ArrayProgram
+from vm.opcodes.opcodes import OPCode, OPCodeType
+from vm.runtime.loops import LOOP_SLOTS_COUNT
+from vm.runtime.utils import is_float_literal
+from vm.runtime.value import Value, StringValue, NumberValue, BooleanValue, NIL
+
+
+# Prepares compiled program for the execution: operands are decoded once at load time,
+# so the interpreter loop does not parse them on every executed instruction
+class OPCodesLoader:
+    @classmethod
+    def load(cls, opcodes: List[OPCode]) -> List[OPCode]:
+        functions_ends = cls.get_functions_ends(opcodes)
+
+        return [cls._decode_opcode(opcode, functions_ends.get(address)) for address, opcode in enumerate(opcodes)]
+
+    @classmethod
+    def load_array(cls, program: Sequence[OPCode]) -> ArrayProgram:
+        # Instructions are decoded one by one, so the whole program is never expanded to the opcodes objects
+        functions_ends = cls.get_functions_ends(program)
+
+        return ArrayProgram.from_opcodes(cls._decode_opcode(opcode, functions_ends.get(address))
+                                         for address, opcode in enumerate(program))
+
+    @staticmethod
+    def get_functions_ends(opcodes: Sequence[OPCode]) -> Dict[int, int]:
+        # Maps address of every function declaration to the address of its body 'end_scope' opcode
+        functions_ends = {}
+        opened_scopes: List[Optional[int]] = []
+
+        for address, opcode in enumerate(opcodes):
+            if opcode.type == OPCodeType.BEGIN_SCOPE:
+                is_function_body = address > 0 and opcodes[address - 1].type == OPCodeType.FUNCTION
+                opened_scopes.append(address - 1 if is_function_body else None)
+            elif opcode.type == OPCodeType.END_SCOPE:
+                if not opened_scopes:
+                    raise VirtualMachineScopeOrderError(
+                        "Corresponding 'begin_scope' opcode is expected for 'end_scope' at address {}".format(address))
+
+                function_address = opened_scopes.pop()
+
+                if function_address is not None:
+                    functions_ends[function_address] = address
+            elif opcode.type == OPCodeType.FUNCTION:
+                if address + 1 >= len(opcodes) or opcodes[address + 1].type != OPCodeType.BEGIN_SCOPE:
+                    raise VirtualMachineInvalidInstructionError(
+                        "'begin_scope' opcode must follow after function definition")
+
+        for function_address in opened_scopes:
+            if function_address is not None:
+                raise VirtualMachineScopeOrderError(
+                    "Body of the function declared at address {} is not closed".format(function_address))
+
+        return functions_ends
+
+    @staticmethod
+    def get_top_level_locals_count(code: Sequence[OPCode]) -> int:
+        # Frame of the top level code is not declared explicitly, so its size is taken from the slots it uses
+        locals_count = 0
+        address = 0
+
+        while address < len(code):
+            opcode = code[address]
+
+            if opcode.type in (OPCodeType.LOAD_LOCAL, OPCodeType.STORE_LOCAL):
+                locals_count = max(locals_count, opcode.first_arg + 1)
+            elif opcode.type in (OPCodeType.FORPREP, OPCodeType.FORLOOP):
+                locals_count = max(locals_count, opcode.first_arg + LOOP_SLOTS_COUNT)
+            elif opcode.type == OPCodeType.DECLARE_FUNCTION:
+                address = opcode.third_arg
+
+            address += 1
+
+        return locals_count
+
+    @classmethod
+    def _decode_opcode(cls, opcode: OPCode, function_end: Optional[int]) -> OPCode:
+        if opcode.type == OPCodeType.PUSH:
+            return cls._decode_push(opcode)
+        elif opcode.type == OPCodeType.FUNCTION:
+            return OPCode(OPCodeType.DECLARE_FUNCTION, [opcode.first_arg, opcode.second_arg, function_end,
+                                                        opcode.third_arg])
+
+        return opcode
+
+    @classmethod
+    def _decode_push(cls, opcode: OPCode) -> OPCode:
+        value: str = opcode.first_arg
+        constant = cls._decode_literal(value)
+
+        if constant is None:
+            return OPCode(OPCodeType.PUSH_VARIABLE, [value])
+
+        return OPCode(OPCodeType.PUSH_CONST, [constant])
+
+    @staticmethod
+    def _decode_literal(value: str) -> Optional[Value]:
+        if value.startswith('"'):
+            return StringValue(str(value[1:-1]))
+        elif is_float_literal(value):
+            return NumberValue(float(value))
+        elif value == "nil":
+            return NIL
+        elif value == "true" or value == "false":
+            return BooleanValue.of(value == "true")
+        else:
+            return None
@@ -4,14 +4,31 @@ from enum import Enum, auto
 from typing import List, Optional
 
 from vm.exceptions.common import OPCodeValidationError
+from vm.runtime.value import Value
 
 
 class OPCodeType(Enum):
-    # Declares a function (save pointer to function in current scope)
-    # Example: function test
+    # Declares a function (save pointer to function in current scope) with the given number of frame slots
+    # and parameters
+    # Example: function test 2 1
     FUNCTION = auto()
 
-    # Returns from the function (the return values should be pushed to the stack)
+    # Declares a function which body ends at the given address (produced by the loader from 'function')
+    # Example: declare_function test 2 15 1
+    DECLARE_FUNCTION = auto()
+
+    # Gets start, limit and step of the numeric loop from the stack and saves them to the frame slots starting
+    # from the given one, pushes start to the stack or jumps to the label if the loop should not run at all
+    # Example: forprep 2 end
+    FORPREP = auto()
+
+    # Advances counter of the numeric loop saved in the frame slots starting from the given one
+    # and if the limit is not exceeded pushes it to the stack and jumps to the label
+    # Example: forloop 2 start
+    FORLOOP = auto()
+
+    # Returns from the function (the given number of return values should be pushed to the stack), values
+    # are moved to the place of the call arguments and adjusted to the number of results expected by the call
     # Example: return 5
     RETURN = auto()
 
@@ -19,6 +36,14 @@ class OPCodeType(Enum):
     # Example: push 10, push var
     PUSH = auto()
 
+    # Pushes ready-made constant value to the stack (produced by the loader from 'push' with literal operand)
+    # Example: push_const NumberValue(10)
+    PUSH_CONST = auto()
+
+    # Pushes value of the variable to the stack (produced by the loader from 'push' with identifier operand)
+    # Example: push_variable var
+    PUSH_VARIABLE = auto()
+
     # Pops value from the stack
     # Example: pop
     POP = auto()
@@ -31,10 +56,24 @@ class OPCodeType(Enum):
     # Example: assign var 1
     ASSIGN = auto()
 
-    # Pops value from the stack and calls it with specified number of arguments
-    # Example: call 3
+    # Pushes value of the local variable stored in the given slot of the current call frame
+    # Example: load_local 0
+    LOAD_LOCAL = auto()
+
+    # Gets value from the stack and stores it to the given slot of the current call frame
+    # Example: store_local 0
+    STORE_LOCAL = auto()
+
+    # Pops value from the stack and calls it with specified number of arguments, the given number
+    # of results is left on the stack
+    # Example: call 3 1
     CALL = auto()
 
+    # Pops value from the stack and calls it with specified number of arguments in place of the current function,
+    # so the frame of the current function is reused and results are returned right to its caller
+    # Example: tailcall 3
+    TAILCALL = auto()
+
     # Gets two values from the stack, sums them and pushes result
     # Example: sum
     SUM = auto()
@@ -51,6 +90,54 @@ class OPCodeType(Enum):
     # Example: jump_pos start
     JUMP_POS = auto()
 
+    # Gets two values from the stack, compares them as 'cmp_eq' does and jumps to the label if it succeeds
+    # Example: jump_if_eq start
+    JUMP_IF_EQ = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_eq' does and jumps to the label if it fails
+    # Example: jump_if_eq_neg start
+    JUMP_IF_EQ_NEG = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_ne' does and jumps to the label if it succeeds
+    # Example: jump_if_ne start
+    JUMP_IF_NE = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_ne' does and jumps to the label if it fails
+    # Example: jump_if_ne_neg start
+    JUMP_IF_NE_NEG = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_lt' does and jumps to the label if it succeeds
+    # Example: jump_if_lt start
+    JUMP_IF_LT = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_lt' does and jumps to the label if it fails
+    # Example: jump_if_lt_neg start
+    JUMP_IF_LT_NEG = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_gt' does and jumps to the label if it succeeds
+    # Example: jump_if_gt start
+    JUMP_IF_GT = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_gt' does and jumps to the label if it fails
+    # Example: jump_if_gt_neg start
+    JUMP_IF_GT_NEG = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_le' does and jumps to the label if it succeeds
+    # Example: jump_if_le start
+    JUMP_IF_LE = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_le' does and jumps to the label if it fails
+    # Example: jump_if_le_neg start
+    JUMP_IF_LE_NEG = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_ge' does and jumps to the label if it succeeds
+    # Example: jump_if_ge start
+    JUMP_IF_GE = auto()
+
+    # Gets two values from the stack, compares them as 'cmp_ge' does and jumps to the label if it fails
+    # Example: jump_if_ge_neg start
+    JUMP_IF_GE_NEG = auto()
+
     # Gets two values from the stack, subtracts them and pushes result
     # Example: subtract
     SUBTRACT = auto()
@@ -115,6 +202,46 @@ class OPCodeType(Enum):
     # Example: concat
     CONCAT = auto()
 
+    # Gets two numbers from the stack, sums them and pushes result (quickened by the VM from 'sum')
+    # Example: sum_numbers
+    SUM_NUMBERS = auto()
+
+    # Gets two numbers from the stack, subtracts them and pushes result (quickened by the VM from 'subtract')
+    # Example: subtract_numbers
+    SUBTRACT_NUMBERS = auto()
+
+    # Gets two numbers from the stack, multiplies them and pushes result (quickened by the VM from 'multiply')
+    # Example: multiply_numbers
+    MULTIPLY_NUMBERS = auto()
+
+    # Gets two numbers from the stack, divides them and pushes result (quickened by the VM from 'divide')
+    # Example: divide_numbers
+    DIVIDE_NUMBERS = auto()
+
+    # Gets two numbers from the stack, compares them and pushes result (quickened by the VM from 'cmp_eq')
+    # Example: cmp_eq_numbers
+    CMP_EQ_NUMBERS = auto()
+
+    # Gets two numbers from the stack, compares them and pushes result (quickened by the VM from 'cmp_ne')
+    # Example: cmp_ne_numbers
+    CMP_NE_NUMBERS = auto()
+
+    # Gets two numbers from the stack, compares them and pushes result (quickened by the VM from 'cmp_lt')
+    # Example: cmp_lt_numbers
+    CMP_LT_NUMBERS = auto()
+
+    # Gets two numbers from the stack, compares them and pushes result (quickened by the VM from 'cmp_gt')
+    # Example: cmp_gt_numbers
+    CMP_GT_NUMBERS = auto()
+
+    # Gets two numbers from the stack, compares them and pushes result (quickened by the VM from 'cmp_le')
+    # Example: cmp_le_numbers
+    CMP_LE_NUMBERS = auto()
+
+    # Gets two numbers from the stack, compares them and pushes result (quickened by the VM from 'cmp_ge')
+    # Example: cmp_ge_numbers
+    CMP_GE_NUMBERS = auto()
+
 
 class OPCodeArgDefinition:
     def __init__(self, arg_type):
@@ -141,17 +268,41 @@ class OPCodeDefinition:
 
 class OPCodesDefinitions:
     _opcodes_definitions = {
-        OPCodeType.FUNCTION: OPCodeDefinition("function", [OPCodeArgDefinition(str)]),
+        OPCodeType.FUNCTION: OPCodeDefinition("function", [OPCodeArgDefinition(str), OPCodeArgDefinition(int),
+                                                           OPCodeArgDefinition(int)]),
+        OPCodeType.DECLARE_FUNCTION: OPCodeDefinition("declare_function", [OPCodeArgDefinition(str),
+                                                                            OPCodeArgDefinition(int),
+                                                                            OPCodeArgDefinition(int),
+                                                                            OPCodeArgDefinition(int)]),
         OPCodeType.RETURN: OPCodeDefinition("return", [OPCodeArgDefinition(int)]),
+        OPCodeType.FORPREP: OPCodeDefinition("forprep", [OPCodeArgDefinition(int), OPCodeArgDefinition(int)]),
+        OPCodeType.FORLOOP: OPCodeDefinition("forloop", [OPCodeArgDefinition(int), OPCodeArgDefinition(int)]),
         OPCodeType.PUSH: OPCodeDefinition("push", [OPCodeArgDefinition(str)]),
+        OPCodeType.PUSH_CONST: OPCodeDefinition("push_const", [OPCodeArgDefinition(Value)]),
+        OPCodeType.PUSH_VARIABLE: OPCodeDefinition("push_variable", [OPCodeArgDefinition(str)]),
         OPCodeType.POP: OPCodeDefinition("pop"),
         OPCodeType.DECLARE_LOCAL: OPCodeDefinition("declare_local", [OPCodeArgDefinition(str)]),
         OPCodeType.ASSIGN: OPCodeDefinition("assign", [OPCodeArgDefinition(str)]),
-        OPCodeType.CALL: OPCodeDefinition("call", [OPCodeArgDefinition(int)]),
+        OPCodeType.LOAD_LOCAL: OPCodeDefinition("load_local", [OPCodeArgDefinition(int)]),
+        OPCodeType.STORE_LOCAL: OPCodeDefinition("store_local", [OPCodeArgDefinition(int)]),
+        OPCodeType.CALL: OPCodeDefinition("call", [OPCodeArgDefinition(int), OPCodeArgDefinition(int)]),
+        OPCodeType.TAILCALL: OPCodeDefinition("tailcall", [OPCodeArgDefinition(int)]),
         OPCodeType.SUM: OPCodeDefinition("sum"),
         OPCodeType.JUMP: OPCodeDefinition("jump", [OPCodeArgDefinition(int)]),
         OPCodeType.JUMP_NEG: OPCodeDefinition("jump_neg", [OPCodeArgDefinition(int)]),
         OPCodeType.JUMP_POS: OPCodeDefinition("jump_pos", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_EQ: OPCodeDefinition("jump_if_eq", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_EQ_NEG: OPCodeDefinition("jump_if_eq_neg", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_NE: OPCodeDefinition("jump_if_ne", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_NE_NEG: OPCodeDefinition("jump_if_ne_neg", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_LT: OPCodeDefinition("jump_if_lt", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_LT_NEG: OPCodeDefinition("jump_if_lt_neg", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_GT: OPCodeDefinition("jump_if_gt", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_GT_NEG: OPCodeDefinition("jump_if_gt_neg", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_LE: OPCodeDefinition("jump_if_le", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_LE_NEG: OPCodeDefinition("jump_if_le_neg", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_GE: OPCodeDefinition("jump_if_ge", [OPCodeArgDefinition(int)]),
+        OPCodeType.JUMP_IF_GE_NEG: OPCodeDefinition("jump_if_ge_neg", [OPCodeArgDefinition(int)]),
         OPCodeType.SUBTRACT: OPCodeDefinition("subtract"),
         OPCodeType.MULTIPLY: OPCodeDefinition("multiply"),
         OPCodeType.DIVIDE: OPCodeDefinition("divide"),
@@ -168,12 +319,30 @@ class OPCodesDefinitions:
         OPCodeType.CMP_LE: OPCodeDefinition("cmp_le"),
         OPCodeType.CMP_GE: OPCodeDefinition("cmp_ge"),
         OPCodeType.CONCAT: OPCodeDefinition("concat"),
+        OPCodeType.SUM_NUMBERS: OPCodeDefinition("sum_numbers"),
+        OPCodeType.SUBTRACT_NUMBERS: OPCodeDefinition("subtract_numbers"),
+        OPCodeType.MULTIPLY_NUMBERS: OPCodeDefinition("multiply_numbers"),
+        OPCodeType.DIVIDE_NUMBERS: OPCodeDefinition("divide_numbers"),
+        OPCodeType.CMP_EQ_NUMBERS: OPCodeDefinition("cmp_eq_numbers"),
+        OPCodeType.CMP_NE_NUMBERS: OPCodeDefinition("cmp_ne_numbers"),
+        OPCodeType.CMP_LT_NUMBERS: OPCodeDefinition("cmp_lt_numbers"),
+        OPCodeType.CMP_GT_NUMBERS: OPCodeDefinition("cmp_gt_numbers"),
+        OPCodeType.CMP_LE_NUMBERS: OPCodeDefinition("cmp_le_numbers"),
+        OPCodeType.CMP_GE_NUMBERS: OPCodeDefinition("cmp_ge_numbers"),
     }
 
     @classmethod
     def get_definition(cls, opcode_type: OPCodeType) -> OPCodeDefinition:
         return cls._opcodes_definitions.get(opcode_type)
 
+    @classmethod
+    def get_opcode_type(cls, name: str) -> Optional[OPCodeType]:
+        for opcode_type, opcode_definition in cls._opcodes_definitions.items():
+            if opcode_definition.name == name:
+                return opcode_type
+
+        return None
+
 
 class OPCode:
     def __init__(self, opcode_type: OPCodeType, args=None):
@@ -199,8 +368,43 @@ class OPCode:
     def second_arg(self):
         return self.get_arg(1)
 
+    @property
+    def third_arg(self):
+        return self.get_arg(2)
+
+    @property
+    def fourth_arg(self):
+        return self.get_arg(3)
+
     def get_arg(self, arg_index: int):
         return self._args[arg_index]
 
     def __str__(self):
         return "OPCode(type={}, args={})".format(self._type, self._args)
+
+
+# Fused comparisons and conditional jumps mapped to the comparison and its result on which the jump is performed
+FUSED_COMPARISON_JUMPS = {
+    OPCodeType.JUMP_IF_EQ: (OPCodeType.CMP_EQ, True),
+    OPCodeType.JUMP_IF_EQ_NEG: (OPCodeType.CMP_EQ, False),
+    OPCodeType.JUMP_IF_NE: (OPCodeType.CMP_NE, True),
+    OPCodeType.JUMP_IF_NE_NEG: (OPCodeType.CMP_NE, False),
+    OPCodeType.JUMP_IF_LT: (OPCodeType.CMP_LT, True),
+    OPCodeType.JUMP_IF_LT_NEG: (OPCodeType.CMP_LT, False),
+    OPCodeType.JUMP_IF_GT: (OPCodeType.CMP_GT, True),
+    OPCodeType.JUMP_IF_GT_NEG: (OPCodeType.CMP_GT, False),
+    OPCodeType.JUMP_IF_LE: (OPCodeType.CMP_LE, True),
+    OPCodeType.JUMP_IF_LE_NEG: (OPCodeType.CMP_LE, False),
+    OPCodeType.JUMP_IF_GE: (OPCodeType.CMP_GE, True),
+    OPCodeType.JUMP_IF_GE_NEG: (OPCodeType.CMP_GE, False),
+}
+
+# Jump instructions mapped to the index of their target address argument
+JUMP_ADDRESS_ARGS = {
+    OPCodeType.JUMP: 0,
+    OPCodeType.JUMP_NEG: 0,
+    OPCodeType.JUMP_POS: 0,
+    OPCodeType.FORPREP: 1,
+    OPCodeType.FORLOOP: 1,
+    **{fused_jump_type: 0 for fused_jump_type in FUSED_COMPARISON_JUMPS},
+}
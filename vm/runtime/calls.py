@@ -0,0 +1,53 @@
+from itertools import repeat
+from typing import Callable, List
+
+from vm.runtime.value import Value, NIL
+
+# Builtin caller receives the function, the values stack with the arguments on its top and the arguments count.
+# Arguments are passed right from the stack and replaced by the call result, so no arguments list is built
+BuiltinCaller = Callable[[Callable, List[Value], int], None]
+
+
+def call_builtin_0(function: Callable, stack: List[Value], args_count: int):
+    stack.append(function())
+
+
+def call_builtin_1(function: Callable, stack: List[Value], args_count: int):
+    stack[-1] = function(stack[-1])
+
+
+def call_builtin_2(function: Callable, stack: List[Value], args_count: int):
+    result = function(stack[-2], stack[-1])
+    del stack[-1]
+    stack[-1] = result
+
+
+def call_builtin_3(function: Callable, stack: List[Value], args_count: int):
+    result = function(stack[-3], stack[-2], stack[-1])
+    del stack[-2:]
+    stack[-1] = result
+
+
+def call_builtin_n(function: Callable, stack: List[Value], args_count: int):
+    args_base = len(stack) - args_count
+    result = function(*stack[args_base:])
+    del stack[args_base + 1:]
+    stack[args_base] = result
+
+
+FIXED_ARITY_BUILTIN_CALLERS = (call_builtin_0, call_builtin_1, call_builtin_2, call_builtin_3)
+
+
+def get_builtin_caller(args_count: int) -> BuiltinCaller:
+    if args_count < len(FIXED_ARITY_BUILTIN_CALLERS):
+        return FIXED_ARITY_BUILTIN_CALLERS[args_count]
+
+    return call_builtin_n
+
+
+def adjust_builtin_results(stack: List[Value], results_count: int):
+    # Builtin function returns exactly one value, it is dropped or completed with nils as the call expects
+    if results_count == 0:
+        del stack[-1]
+    elif results_count > 1:
+        stack.extend(repeat(NIL, results_count - 1))
@@ -0,0 +1,24 @@
+import operator
+from typing import Callable, Dict
+
+from vm.opcodes.opcodes import OPCodeType
+from vm.runtime.value import Value
+
+# Comparisons of the raw python values, ordering follows the semantics of Value.__lt__ and its derivatives
+RAW_COMPARISONS: Dict[OPCodeType, Callable[[object, object], bool]] = {
+    OPCodeType.CMP_EQ: operator.eq,
+    OPCodeType.CMP_NE: operator.ne,
+    OPCodeType.CMP_LT: operator.le,
+    OPCodeType.CMP_GT: lambda left, right: not left <= right,
+    OPCodeType.CMP_LE: operator.le,
+    OPCodeType.CMP_GE: lambda left, right: not left <= right,
+}
+
+VALUE_COMPARISONS: Dict[OPCodeType, Callable[[Value, Value], Value]] = {
+    OPCodeType.CMP_EQ: lambda left, right: left.__eq__(right),
+    OPCodeType.CMP_NE: lambda left, right: left.__ne__(right),
+    OPCodeType.CMP_LT: lambda left, right: left.__lt__(right),
+    OPCodeType.CMP_GT: lambda left, right: left.__gt__(right),
+    OPCodeType.CMP_LE: lambda left, right: left.__le__(right),
+    OPCodeType.CMP_GE: lambda left, right: left.__ge__(right),
+}
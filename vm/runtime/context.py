@@ -1,15 +1,27 @@
-from typing import List
+from itertools import repeat
+from typing import List, Optional, Sequence
 
 from vm.exceptions.common import VirtualMachineScopeOrderError, VirtualMachineInvalidOperationError
 from vm.opcodes.opcodes import OPCode
+from vm.runtime.inline_cache import InlineCache, create_inline_caches
 from vm.runtime.scope import Scope
-from vm.runtime.value import Value, CustomFunctionValue
+from vm.runtime.value import Value, CustomFunctionValue, NIL
+
+
+# Number of call contexts created in advance, so the calls of the usual nesting depth do not allocate them
+PREALLOCATED_CALL_CONTEXTS_COUNT = 16
 
 
 class CallContext:
-    def __init__(self, scope: Scope, return_address: int, override_local_scope: bool = False):
-        self._return_address = return_address
-        self._scopes: List[Scope] = [scope] if override_local_scope else [Scope(scope)]
+    __slots__ = ("_return_address", "_args_base", "_results_count", "_scopes", "_locals")
+
+    # Call contexts are reused, so they are created empty and filled on every call by 'activate'
+    def __init__(self):
+        self._return_address = -1
+        self._args_base = 0
+        self._results_count = 0
+        self._scopes: List[Scope] = []
+        self._locals: List[Value] = []
 
     @property
     def current_scope(self):
@@ -19,6 +31,40 @@ class CallContext:
     def return_address(self):
         return self._return_address
 
+    @property
+    def args_base(self):
+        return self._args_base
+
+    @property
+    def results_count(self):
+        return self._results_count
+
+    @property
+    def locals(self) -> List[Value]:
+        return self._locals
+
+    def activate(self, scope: Scope, return_address: int, locals_count: int = 0, override_local_scope: bool = False,
+                 args_base: int = 0, results_count: int = 0):
+        self._return_address = return_address
+        self._args_base = args_base
+        self._results_count = results_count
+        self._scopes.append(scope if override_local_scope else Scope(scope))
+        self._locals.extend(repeat(NIL, locals_count))
+
+    def release(self):
+        # Drops references to the scopes and values of the finished call, the lists keep their capacity
+        self._scopes.clear()
+        self._locals.clear()
+
+    def get_outer_scope(self) -> Scope:
+        # Scopes without values are transparent for the names lookup, so the nearest scope with values is taken
+        # and if the frame has not declared anything by name, the scope it was called from is returned
+        for scope in reversed(self._scopes):
+            if not scope.is_empty:
+                return scope
+
+        return self._scopes[0].parent
+
     def create_scope(self):
         self._scopes.append(Scope(self.current_scope))
 
@@ -26,12 +72,19 @@ class CallContext:
         if len(self._scopes) <= 1:
             raise VirtualMachineScopeOrderError("Failed to destroy the last scope")
 
+        self._scopes.pop()
+
 
 class ExecutionContext:
-    def __init__(self, code: List[OPCode]):
+    def __init__(self, code: Sequence[OPCode], locals_count: int = 0):
         self._global_scope = Scope(None)
-        self._code: List[OPCode] = code
-        self._call_stack: List[CallContext] = [CallContext(self._global_scope, -1, override_local_scope=True)]
+        self._code: Sequence[OPCode] = code
+        self._inline_caches: List[Optional[InlineCache]] = create_inline_caches(code)
+        self._free_call_contexts: List[CallContext] = [
+            CallContext() for _ in range(PREALLOCATED_CALL_CONTEXTS_COUNT)
+        ]
+        self._call_stack: List[CallContext] = [self._acquire_call_context(self._global_scope, -1, locals_count,
+                                                                          override_local_scope=True)]
         self._values_stack: List[Value] = []
         self._instruction_address: int = 0
 
@@ -55,6 +108,18 @@ class ExecutionContext:
     def global_scope(self) -> Scope:
         return self._global_scope
 
+    @property
+    def code(self) -> Sequence[OPCode]:
+        return self._code
+
+    @property
+    def values_stack(self) -> List[Value]:
+        return self._values_stack
+
+    @property
+    def inline_caches(self) -> List[Optional[InlineCache]]:
+        return self._inline_caches
+
     @property
     def current_instruction(self) -> OPCode:
         return self._code[self._instruction_address]
@@ -73,6 +138,23 @@ class ExecutionContext:
         # so check that scope do not change after jump
         self._instruction_address = address
 
+    def load_variable(self, name: str, cache: InlineCache) -> Value:
+        global_scope = self._global_scope
+
+        if cache.version == global_scope.version:
+            return cache.value
+
+        value = self.current_scope.get_value(name)
+
+        if value is None:
+            value = NIL
+
+        if global_scope.is_global_name(name):
+            cache.version = global_scope.version
+            cache.value = value
+
+        return value
+
     def push_value(self, value: Value):
         self._values_stack.append(value)
 
@@ -88,10 +170,69 @@ class ExecutionContext:
 
         self._instruction_address += 1
 
-    def enter_to_call_context(self, function: CustomFunctionValue):
-        self._call_stack.append(CallContext(self.current_scope, self._instruction_address))
+    def enter_to_call_context(self, function: CustomFunctionValue, args_count: int, results_count: int):
+        # Arguments are left on the stack above the recorded base and adjusted to the parameters count,
+        # so the function prologue always takes exactly the values passed by this call
+        args_base = len(self._values_stack) - args_count
+        self._adjust_arguments(args_base, args_count, function.parameters_count)
+
+        self._call_stack.append(self._acquire_call_context(self.current_scope, self._instruction_address,
+                                                           function.locals_count, False, args_base, results_count))
         self._instruction_address = function.instruction_address
 
-    def return_from_call_context(self):
+    def enter_to_tail_call_context(self, function: CustomFunctionValue, args_count: int):
+        # Frame of the current function is reused by the called one: arguments are moved to the frame base at once
+        # dropping the values left by the current function, and results go right to the caller of the frame.
+        # Names are resolved the same way as for the usual call, but the empty scopes of the replaced function
+        # are not kept, so the tail recursion without captured locals runs in constant memory
+        call_context = self._call_stack[-1]
+        outer_scope = call_context.get_outer_scope()
+        values_stack = self._values_stack
+        args_base = call_context.args_base
+
+        values_stack[args_base:] = values_stack[len(values_stack) - args_count:]
+        self._adjust_arguments(args_base, args_count, function.parameters_count)
+
+        return_address = call_context.return_address
+        results_count = call_context.results_count
+
+        call_context.release()
+        call_context.activate(outer_scope, return_address, function.locals_count, False, args_base,
+                              results_count)
+        self._instruction_address = function.instruction_address
+
+    def return_from_call_context(self, returned_count: int):
         destroyed_context = self._call_stack.pop()
         self._instruction_address = destroyed_context.return_address
+
+        values_stack = self._values_stack
+        args_base = destroyed_context.args_base
+        results_count = destroyed_context.results_count
+        results_base = len(values_stack) - returned_count
+
+        if results_base != args_base or returned_count != results_count:
+            # Results are moved to the arguments base at once, surplus values are dropped and missing ones are nil
+            values_stack[args_base:] = values_stack[results_base:results_base + results_count]
+
+            if returned_count < results_count:
+                values_stack.extend(repeat(NIL, results_count - returned_count))
+
+        destroyed_context.release()
+        self._free_call_contexts.append(destroyed_context)
+
+    def _adjust_arguments(self, args_base: int, args_count: int, parameters_count: int):
+        values_stack = self._values_stack
+
+        if args_count < parameters_count:
+            values_stack.extend(repeat(NIL, parameters_count - args_count))
+        elif args_count > parameters_count:
+            del values_stack[args_base + parameters_count:]
+
+    def _acquire_call_context(self, scope: Scope, return_address: int, locals_count: int,
+                              override_local_scope: bool = False, args_base: int = 0,
+                              results_count: int = 0) -> CallContext:
+        free_call_contexts = self._free_call_contexts
+        call_context = free_call_contexts.pop() if free_call_contexts else CallContext()
+        call_context.activate(scope, return_address, locals_count, override_local_scope, args_base, results_count)
+
+        return call_context
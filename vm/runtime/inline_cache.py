@@ -0,0 +1,20 @@
+from typing import List, Optional, Sequence
+
+from vm.opcodes.opcodes import OPCode, OPCodeType
+from vm.runtime.value import Value
+
+
+class InlineCache:
+    __slots__ = ("version", "value", "target")
+
+    def __init__(self):
+        # Global scope version the cached value is valid for
+        self.version = -1
+        self.value: Optional[Value] = None
+        # Resolved call target of the cached callable value
+        self.target = None
+
+
+def create_inline_caches(code: Sequence[OPCode]) -> List[Optional[InlineCache]]:
+    return [InlineCache() if instruction.type in (OPCodeType.PUSH_VARIABLE, OPCodeType.CALL, OPCodeType.TAILCALL)
+            else None for instruction in code]
@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+from vm.exceptions.common import VirtualMachineInvalidOperationError
+from vm.runtime.value import NumberValue
+
+# Numeric loop state is kept in three consecutive frame slots as raw numbers: counter, limit and step
+LOOP_SLOTS_COUNT = 3
+
+
+def _get_loop_number(value, description: str) -> float:
+    # Accepts both boxed numbers and raw ones (kept on the stack in the unboxed mode)
+    value_type = type(value)
+
+    if value_type is NumberValue:
+        return value.value
+    elif value_type is float:
+        return value
+
+    raise VirtualMachineInvalidOperationError("'for' {} must be a number".format(description))
+
+
+def prepare_numeric_loop(frame_locals: List, base_slot: int, start, limit, step) -> Optional[float]:
+    # Returns the first counter value or None if the loop should not run at all
+    start = _get_loop_number(start, "initial value")
+    limit = _get_loop_number(limit, "limit")
+    step = _get_loop_number(step, "step")
+
+    if step == 0:
+        raise VirtualMachineInvalidOperationError("'for' step is zero")
+
+    frame_locals[base_slot] = start
+    frame_locals[base_slot + 1] = limit
+    frame_locals[base_slot + 2] = step
+
+    if start <= limit if step > 0 else start >= limit:
+        return start
+
+    return None
+
+
+def advance_numeric_loop(frame_locals: List, base_slot: int) -> Optional[float]:
+    # Returns the next counter value or None if the loop is finished
+    step = frame_locals[base_slot + 2]
+    counter = frame_locals[base_slot] + step
+
+    if counter <= frame_locals[base_slot + 1] if step > 0 else counter >= frame_locals[base_slot + 1]:
+        frame_locals[base_slot] = counter
+        return counter
+
+    return None
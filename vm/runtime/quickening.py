@@ -0,0 +1,43 @@
+from typing import Callable, Dict
+
+from vm.opcodes.opcodes import OPCodeType
+from vm.runtime.comparisons import RAW_COMPARISONS
+from vm.runtime.value import Value, NumberValue, BooleanValue
+
+# Generic instructions which are rewritten to the number-number variants once both operands are observed to be numbers
+QUICKENED_OPCODES: Dict[OPCodeType, OPCodeType] = {
+    OPCodeType.SUM: OPCodeType.SUM_NUMBERS,
+    OPCodeType.SUBTRACT: OPCodeType.SUBTRACT_NUMBERS,
+    OPCodeType.MULTIPLY: OPCodeType.MULTIPLY_NUMBERS,
+    OPCodeType.DIVIDE: OPCodeType.DIVIDE_NUMBERS,
+    OPCodeType.CMP_EQ: OPCodeType.CMP_EQ_NUMBERS,
+    OPCodeType.CMP_NE: OPCodeType.CMP_NE_NUMBERS,
+    OPCodeType.CMP_LT: OPCodeType.CMP_LT_NUMBERS,
+    OPCodeType.CMP_GT: OPCodeType.CMP_GT_NUMBERS,
+    OPCodeType.CMP_LE: OPCodeType.CMP_LE_NUMBERS,
+    OPCodeType.CMP_GE: OPCodeType.CMP_GE_NUMBERS,
+}
+
+GENERIC_OPCODES: Dict[OPCodeType, OPCodeType] = {
+    quickened_type: generic_type for generic_type, quickened_type in QUICKENED_OPCODES.items()
+}
+
+
+def _number_comparison(comparison_type: OPCodeType) -> Callable[[float, float], Value]:
+    compare = RAW_COMPARISONS[comparison_type]
+
+    return lambda left, right: BooleanValue.of(compare(left, right))
+
+
+NUMBER_OPERATIONS: Dict[OPCodeType, Callable[[float, float], Value]] = {
+    OPCodeType.SUM_NUMBERS: lambda left, right: NumberValue.of(left + right),
+    OPCodeType.SUBTRACT_NUMBERS: lambda left, right: NumberValue.of(left - right),
+    OPCodeType.MULTIPLY_NUMBERS: lambda left, right: NumberValue.of(left * right),
+    OPCodeType.DIVIDE_NUMBERS: lambda left, right: NumberValue.of(left / right),
+    OPCodeType.CMP_EQ_NUMBERS: _number_comparison(OPCodeType.CMP_EQ),
+    OPCodeType.CMP_NE_NUMBERS: _number_comparison(OPCodeType.CMP_NE),
+    OPCodeType.CMP_LT_NUMBERS: _number_comparison(OPCodeType.CMP_LT),
+    OPCodeType.CMP_GT_NUMBERS: _number_comparison(OPCodeType.CMP_GT),
+    OPCodeType.CMP_LE_NUMBERS: _number_comparison(OPCodeType.CMP_LE),
+    OPCodeType.CMP_GE_NUMBERS: _number_comparison(OPCodeType.CMP_GE),
+}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Set
 
 from vm.runtime.value import Value
 
@@ -9,6 +9,29 @@ class Scope:
     def __init__(self, parent: Optional[Scope] = None):
         self._parent = parent
         self._values = {}
+        self._global_scope: Scope = self if parent is None else parent._global_scope
+
+        if parent is None:
+            # Version of the global scope is changed on every write to it and on every first declaration
+            # of some name in the nested scopes, so the cached lookups results can be validated by it
+            self._version = 0
+            self._local_names: Set[str] = set()
+
+    @property
+    def parent(self) -> Optional[Scope]:
+        return self._parent
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._values
+
+    @property
+    def version(self) -> int:
+        return self._global_scope._version
+
+    def is_global_name(self, name: str) -> bool:
+        # Global name is never shadowed by the nested scopes, so it is always resolved in the global scope
+        return name not in self._global_scope._local_names
 
     def has_local_value(self, name: str):
         return self._values.get(name) is not None
@@ -17,6 +40,14 @@ class Scope:
         return self._values.get(name, default)
 
     def set_local_value(self, name: str, value: Value):
+        global_scope = self._global_scope
+
+        if global_scope is self:
+            global_scope._version += 1
+        elif name not in global_scope._local_names:
+            global_scope._local_names.add(name)
+            global_scope._version += 1
+
         self._values[name] = value
 
     def has_value(self, name: str):
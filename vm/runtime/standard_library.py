@@ -2,7 +2,7 @@ import math
 
 from vm.exceptions.common import VirtualMachineInvalidOperationError
 from vm.runtime.value import Value, NumberValue, StringValue, NilValue, BuiltinFunctionValue, CustomFunctionValue, \
-    BooleanValue
+    BooleanValue, NIL
 
 
 class GeneralIOFunctions:
@@ -15,7 +15,7 @@ class GeneralIOFunctions:
 
         print(*printed_args)
 
-        return NilValue()
+        return NIL
 
     @classmethod
     def read(cls):
@@ -43,7 +43,7 @@ class GeneralIOFunctions:
 class GeneralMathFunctions:
     @classmethod
     def sin(cls, arg: NumberValue):
-        return NumberValue(math.sin(arg.value))
+        return NumberValue.of(math.sin(arg.value))
 
 
 class GeneralConversionsFunctions:
@@ -70,7 +70,7 @@ class GeneralConversionsFunctions:
         if isinstance(arg, NumberValue):
             return NumberValue(arg.value)
         elif isinstance(arg, BooleanValue):
-            return NumberValue(int(arg.value))
+            return NumberValue.of(int(arg.value))
         elif isinstance(arg, StringValue):
             return NumberValue(float(arg.value))
         else:
@@ -0,0 +1,85 @@
+from typing import Callable, Dict
+
+from vm.opcodes.opcodes import OPCodeType
+from vm.runtime.comparisons import RAW_COMPARISONS, VALUE_COMPARISONS
+from vm.runtime.value import Value, NumberValue, StringValue, BooleanValue
+
+# In the unboxed mode numbers, strings and booleans are kept on the stack as raw float, str and bool objects
+# (their python type plays the role of the type tag), other values are kept boxed
+
+
+def box(value) -> Value:
+    value_type = type(value)
+
+    if value_type is float:
+        return NumberValue.of(value)
+    elif value_type is str:
+        return StringValue(value)
+    elif value_type is bool:
+        return BooleanValue.of(value)
+
+    return value
+
+
+def unbox(value):
+    value_type = type(value)
+
+    if value_type is NumberValue or value_type is StringValue or value_type is BooleanValue:
+        return value.value
+
+    return value
+
+
+def _boxed_binary_operation(operation: Callable[[Value, Value], Value]):
+    # Operands of the unsupported types are processed by the boxed values, so errors are reported the same way
+    def boxed_binary_operation(left, right):
+        return unbox(operation(box(left), box(right)))
+
+    return boxed_binary_operation
+
+
+def _binary_operation(fast_operation: Callable, boxed_operation: Callable[[Value, Value], Value], *operand_types):
+    fallback = _boxed_binary_operation(boxed_operation)
+
+    def binary_operation(left, right):
+        left_type = type(left)
+
+        if left_type is type(right) and left_type in operand_types:
+            return fast_operation(left, right)
+
+        return fallback(left, right)
+
+    return binary_operation
+
+
+UNBOXED_BINARY_OPERATIONS: Dict[OPCodeType, Callable] = {
+    OPCodeType.MULTIPLY: _binary_operation(lambda left, right: left * right,
+                                           lambda left, right: left * right, float),
+    OPCodeType.SUM: _binary_operation(lambda left, right: left + right,
+                                      lambda left, right: left + right, float),
+    OPCodeType.SUBTRACT: _binary_operation(lambda left, right: left - right,
+                                           lambda left, right: left - right, float),
+    OPCodeType.DIVIDE: _binary_operation(lambda left, right: left / right,
+                                         lambda left, right: left / right, float),
+    OPCodeType.BOOLEAN_AND: _binary_operation(lambda left, right: left and right,
+                                              lambda left, right: left.boolean_and(right), bool),
+    OPCodeType.BOOLEAN_OR: _binary_operation(lambda left, right: left or right,
+                                             lambda left, right: left.boolean_or(right), bool),
+    OPCodeType.CONCAT: _binary_operation(lambda left, right: left + right,
+                                         lambda left, right: left.concat(right), str),
+}
+
+for comparison_type, raw_comparison in RAW_COMPARISONS.items():
+    UNBOXED_BINARY_OPERATIONS[comparison_type] = _binary_operation(raw_comparison, VALUE_COMPARISONS[comparison_type],
+                                                                   float, str, bool)
+
+
+def unboxed_boolean_not(value):
+    if type(value) is bool:
+        return not value
+
+    return unbox(box(value).boolean_not())
+
+
+def unboxed_minus(value):
+    return unbox(-box(value))
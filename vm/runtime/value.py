@@ -1,11 +1,10 @@
-from typing import Callable
+from typing import Callable, Dict
 
 from vm.exceptions.common import VirtualMachineRuntimeError, VirtualMachineInvalidOperationError
 
 
 class Value:
-    def __init__(self):
-        pass
+    __slots__ = ()
 
     def __mul__(self, other):
         raise VirtualMachineInvalidOperationError("Invalid operands for '*' operation: {} and {}".format(self, other))
@@ -73,9 +72,9 @@ class Value:
 
 
 class StringValue(Value):
-    def __init__(self, value: str):
-        super().__init__()
+    __slots__ = ('value',)
 
+    def __init__(self, value: str):
         self.value = value
 
     def __str__(self):
@@ -83,13 +82,13 @@ class StringValue(Value):
 
     def __eq__(self, other):
         if isinstance(other, StringValue):
-            return BooleanValue(self.value == other.value)
+            return BooleanValue.of(self.value == other.value)
         else:
             super().__eq__(other)
 
     def __lt__(self, other):
         if isinstance(other, StringValue):
-            return BooleanValue(self.value <= other.value)
+            return BooleanValue.of(self.value <= other.value)
         else:
             super().__lt__(other)
 
@@ -101,77 +100,100 @@ class StringValue(Value):
 
 
 class BooleanValue(Value):
-    def __init__(self, value: bool):
-        super().__init__()
+    __slots__ = ('value',)
 
+    def __init__(self, value: bool):
         self.value = value
 
+    @staticmethod
+    def of(value: bool) -> 'BooleanValue':
+        return TRUE if value else FALSE
+
     def __str__(self):
         return "BooleanValue({})".format(self.value)
 
     def boolean_and(self, other):
         if isinstance(other, BooleanValue):
-            return BooleanValue(self.value and other.value)
+            return BooleanValue.of(self.value and other.value)
         else:
             super().boolean_and(other)
 
     def boolean_or(self, other):
         if isinstance(other, BooleanValue):
-            return BooleanValue(self.value or other.value)
+            return BooleanValue.of(self.value or other.value)
         else:
             super().boolean_or(other)
 
     def boolean_not(self):
-        return BooleanValue(not self.value)
+        return BooleanValue.of(not self.value)
 
     def __eq__(self, other):
         if isinstance(other, BooleanValue):
-            return BooleanValue(self.value == other.value)
+            return BooleanValue.of(self.value == other.value)
         else:
             super().__eq__(other)
 
     def __lt__(self, other):
         if isinstance(other, BooleanValue):
-            return BooleanValue(self.value <= other.value)
+            return BooleanValue.of(self.value <= other.value)
         else:
             super().__lt__(other)
 
 
 class NilValue(Value):
-    def __init__(self, ):
-        super().__init__()
+    __slots__ = ()
 
     def __str__(self):
         return "NilValue()"
 
 
 class NumberValue(Value):
-    def __init__(self, value: float):
-        super().__init__()
+    __slots__ = ('value',)
 
+    # Shared instances of the frequently used integral numbers (disabled until enable_cache() is called)
+    _cached_numbers: Dict[float, 'NumberValue'] = {}
+
+    def __init__(self, value: float):
         self.value = value
 
+    @classmethod
+    def of(cls, value: float) -> 'NumberValue':
+        cached_value = cls._cached_numbers.get(value)
+
+        if cached_value is not None:
+            return cached_value
+
+        return NumberValue(value)
+
+    @classmethod
+    def enable_cache(cls, min_value: int = -128, max_value: int = 1024):
+        cls._cached_numbers = {float(value): NumberValue(float(value)) for value in range(min_value, max_value + 1)}
+
+    @classmethod
+    def disable_cache(cls):
+        cls._cached_numbers = {}
+
     def __add__(self, other):
         if isinstance(other, NumberValue):
-            return NumberValue(self.value + other.value)
+            return NumberValue.of(self.value + other.value)
         else:
             super().__add__(other)
 
     def __mul__(self, other):
         if isinstance(other, NumberValue):
-            return NumberValue(self.value * other.value)
+            return NumberValue.of(self.value * other.value)
         else:
             super().__mul__(other)
 
     def __sub__(self, other):
         if isinstance(other, NumberValue):
-            return NumberValue(self.value - other.value)
+            return NumberValue.of(self.value - other.value)
         else:
             super().__sub__(other)
 
     def __truediv__(self, other):
         if isinstance(other, NumberValue):
-            return NumberValue(self.value / other.value)
+            return NumberValue.of(self.value / other.value)
         else:
             super().__truediv__(other)
 
@@ -180,21 +202,21 @@ class NumberValue(Value):
 
     def __eq__(self, other):
         if isinstance(other, NumberValue):
-            return BooleanValue(self.value == other.value)
+            return BooleanValue.of(self.value == other.value)
         else:
             super().__eq__(other)
 
     def __lt__(self, other):
         if isinstance(other, NumberValue):
-            return BooleanValue(self.value <= other.value)
+            return BooleanValue.of(self.value <= other.value)
         else:
             super().__lt__(other)
 
 
 class IdentifierValue(Value):
-    def __init__(self, value: str):
-        super().__init__()
+    __slots__ = ('value',)
 
+    def __init__(self, value: str):
         self.value = value
 
     def __str__(self):
@@ -202,8 +224,9 @@ class IdentifierValue(Value):
 
 
 class BuiltinFunctionValue(Value):
+    __slots__ = ('_name', '_function')
+
     def __init__(self, name: str, function: Callable):
-        super().__init__()
         self._name = name
         self._function = function
 
@@ -223,16 +246,28 @@ class BuiltinFunctionValue(Value):
 
 
 class CustomFunctionValue(Value):
-    def __init__(self, name: str, instruction_address: int, declaration_scope):
-        super().__init__()
+    __slots__ = ('_name', '_instruction_address', '_declaration_scope', '_locals_count', '_parameters_count')
+
+    def __init__(self, name: str, instruction_address: int, declaration_scope, locals_count: int = 0,
+                 parameters_count: int = 0):
         self._name = name
         self._instruction_address = instruction_address
         self._declaration_scope = declaration_scope
+        self._locals_count = locals_count
+        self._parameters_count = parameters_count
 
     @property
     def instruction_address(self):
         return self._instruction_address
 
+    @property
+    def locals_count(self):
+        return self._locals_count
+
+    @property
+    def parameters_count(self):
+        return self._parameters_count
+
     @property
     def name(self):
         return self._name
@@ -243,3 +278,9 @@ class CustomFunctionValue(Value):
 
     def __str__(self):
         return "CustomFunctionValue(name=\"{}\", instruction_address={})".format(self._name, self._instruction_address)
+
+
+# Values are never mutated after creation, so nil and booleans are shared
+NIL = NilValue()
+TRUE = BooleanValue(True)
+FALSE = BooleanValue(False)
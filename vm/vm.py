@@ -1,13 +1,21 @@
-from typing import List, Callable
-
-from vm.exceptions.common import VirtualMachineInvalidInstructionError, VirtualMachineRuntimeError, \
-    VirtualMachineScopeOrderError
-from vm.opcodes.opcodes import OPCode, OPCodeType
+from enum import Enum, auto
+from typing import Callable, Set, Optional, Sequence
+
+from vm.engines.arrays import ArrayEngine
+from vm.engines.closures import ClosuresEngine
+from vm.engines.jit import HotFunctionsJIT
+from vm.exceptions.common import VirtualMachineInvalidInstructionError, VirtualMachineRuntimeError
+from vm.opcodes.array_program import ArrayProgram
+from vm.opcodes.loader import OPCodesLoader
+from vm.opcodes.opcodes import OPCode, OPCodeType, FUSED_COMPARISON_JUMPS
+from vm.runtime.calls import get_builtin_caller, adjust_builtin_results
+from vm.runtime.comparisons import RAW_COMPARISONS, VALUE_COMPARISONS
 from vm.runtime.context import ExecutionContext
+from vm.runtime.loops import prepare_numeric_loop, advance_numeric_loop
+from vm.runtime.quickening import QUICKENED_OPCODES, GENERIC_OPCODES, NUMBER_OPERATIONS
 from vm.runtime.standard_library import GeneralIOFunctions, GeneralMathFunctions, GeneralConversionsFunctions
-from vm.runtime.utils import is_float_literal
-from vm.runtime.value import NumberValue, StringValue, IdentifierValue, Value, BuiltinFunctionValue, NilValue, \
-    CustomFunctionValue, BooleanValue
+from vm.runtime.value import IdentifierValue, Value, BuiltinFunctionValue, CustomFunctionValue, BooleanValue, \
+    NumberValue, NIL
 
 
 def binary_operation_handler(func):
@@ -22,11 +30,45 @@ def binary_operation_handler(func):
     return binary_operation_handler_internal
 
 
+def quickened_operation_handler(func):
+    # Generic handler which rewrites its instruction into the number-number variant after observing two numbers
+    def quickened_operation_handler_internal(self, instruction: OPCode):
+        right = self._pop_operand_value()
+        left = self._pop_operand_value()
+
+        if type(left) is NumberValue and type(right) is NumberValue:
+            self._quicken_instruction(instruction)
+
+        value = func(self, left, right)
+
+        self._context.push_value(value)
+
+    return quickened_operation_handler_internal
+
+
+class ExecutionEngineType(Enum):
+    # Fetches instructions one by one and dispatches them to the handlers
+    INTERPRETER = auto()
+
+    # Runs the program precompiled to the list of specialized closures
+    CLOSURES = auto()
+
+
 class VirtualMachine:
-    def __init__(self, opcodes: List[OPCode]):
-        self._context = ExecutionContext(opcodes)
+    def __init__(self, opcodes: Sequence[OPCode],
+                 engine_type: ExecutionEngineType = ExecutionEngineType.INTERPRETER,
+                 enable_jit: bool = False, unboxed_values: bool = False):
+        if isinstance(opcodes, list):
+            code = OPCodesLoader.load(opcodes)
+        else:
+            # Compact and mapped programs are decoded instruction by instruction right to the arrays,
+            # so no opcode object is kept per instruction
+            code = OPCodesLoader.load_array(opcodes)
+
+        self._context = ExecutionContext(code, OPCodesLoader.get_top_level_locals_count(code))
         self._instructions_handlers = {
-            OPCodeType.PUSH: self._handle_push,
+            OPCodeType.PUSH_CONST: self._handle_push_const,
+            OPCodeType.PUSH_VARIABLE: self._handle_push_variable,
             OPCodeType.POP: self._handle_pop,
             OPCodeType.MULTIPLY: self._handle_multiply,
             OPCodeType.SUM: self._handle_sum,
@@ -34,8 +76,11 @@ class VirtualMachine:
             OPCodeType.DIVIDE: self._handle_divide,
             OPCodeType.DECLARE_LOCAL: self._handle_declare_local,
             OPCodeType.ASSIGN: self._handle_assign,
-            OPCodeType.FUNCTION: self._handle_function,
+            OPCodeType.LOAD_LOCAL: self._handle_load_local,
+            OPCodeType.STORE_LOCAL: self._handle_store_local,
+            OPCodeType.DECLARE_FUNCTION: self._handle_declare_function,
             OPCodeType.CALL: self._handle_call,
+            OPCodeType.TAILCALL: self._handle_tail_call,
             OPCodeType.RETURN: self._handle_return,
             OPCodeType.BEGIN_SCOPE: self._handle_begin_scope,
             OPCodeType.END_SCOPE: self._handle_end_scope,
@@ -52,9 +97,37 @@ class VirtualMachine:
             OPCodeType.JUMP: self._handle_jump,
             OPCodeType.JUMP_NEG: self._handle_jump_neg,
             OPCodeType.JUMP_POS: self._handle_jump_pos,
+            OPCodeType.FORPREP: self._handle_forprep,
+            OPCodeType.FORLOOP: self._handle_forloop,
             OPCodeType.CONCAT: self._handle_concat,
         }
 
+        for opcode_type, operation in NUMBER_OPERATIONS.items():
+            self._instructions_handlers[opcode_type] = self._create_number_operation_handler(operation)
+
+        for opcode_type, (comparison_type, jump_result) in FUSED_COMPARISON_JUMPS.items():
+            self._instructions_handlers[opcode_type] = self._create_comparison_jump_handler(comparison_type,
+                                                                                           jump_result)
+
+        self._despecialized_addresses: Set[int] = set()
+
+        if unboxed_values and (engine_type != ExecutionEngineType.CLOSURES or enable_jit):
+            raise VirtualMachineRuntimeError("Unboxed values are supported by the closures engine without JIT only")
+
+        self._array_engine = None
+
+        if engine_type == ExecutionEngineType.INTERPRETER:
+            self._closures_engine = None
+
+            if isinstance(code, ArrayProgram):
+                self._array_engine = ArrayEngine(self._context, self._instructions_handlers)
+        elif engine_type == ExecutionEngineType.CLOSURES:
+            self._closures_engine = ClosuresEngine(self._context, self._instructions_handlers, unboxed_values)
+        else:
+            raise VirtualMachineRuntimeError("Unknown execution engine type: {}".format(engine_type))
+
+        self._jit = HotFunctionsJIT(self._context, self._instructions_handlers) if enable_jit else None
+
     def register_builtin_function(self, name: str, function: Callable):
         if self._context.global_scope.has_value(name):
             raise VirtualMachineRuntimeError("Failed to register builtin function {}: it already exists".format(name))
@@ -71,6 +144,14 @@ class VirtualMachine:
         self.register_builtin_function("sin", GeneralMathFunctions.sin)
 
     def run(self):
+        if self._closures_engine is not None:
+            self._closures_engine.run()
+            return
+
+        if self._array_engine is not None:
+            self._array_engine.run()
+            return
+
         while not self._context.end_reached:
             instruction = self._context.current_instruction
             self._handle_instruction(instruction)
@@ -85,41 +166,30 @@ class VirtualMachine:
         self._context.move_to_next_instruction()
         handler(instruction)
 
-    def _handle_push(self, instruction: OPCode):
-        value: str = instruction.first_arg
-
-        if value.startswith('"'):
-            self._context.push_value(StringValue(str(value[1:-1])))
-        elif is_float_literal(value):
-            self._context.push_value(NumberValue(float(value)))
-        elif value == "nil":
-            self._context.push_value(NilValue())
-        elif value == "true" or value == "false":
-            self._context.push_value(BooleanValue(value == "true"))
-        else:
-            pushed_value = self._context.current_scope.get_value(value)
+    def _handle_push_const(self, instruction: OPCode):
+        self._context.push_value(instruction.first_arg)
 
-            if pushed_value is None:
-                pushed_value = NilValue()
+    def _handle_push_variable(self, instruction: OPCode):
+        cache = self._context.inline_caches[self._context.instruction_address - 1]
 
-            self._context.push_value(pushed_value)
+        self._context.push_value(self._context.load_variable(instruction.first_arg, cache))
 
     def _handle_pop(self, instruction: OPCode):
         self._context.pop_value()
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_multiply(self, left: Value, right: Value):
         return left * right
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_sum(self, left: Value, right: Value):
         return left + right
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_subtract(self, left: Value, right: Value):
         return left - right
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_divide(self, left: Value, right: Value):
         return left / right
 
@@ -131,27 +201,27 @@ class VirtualMachine:
     def _handle_boolean_or(self, left: Value, right: Value):
         return left.boolean_or(right)
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_cmp_gt(self, left: Value, right: Value):
         return left.__gt__(right)
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_cmp_eq(self, left: Value, right: Value):
         return left.__eq__(right)
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_cmp_ge(self, left: Value, right: Value):
         return left.__ge__(right)
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_cmp_le(self, left: Value, right: Value):
         return left.__le__(right)
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_cmp_lt(self, left: Value, right: Value):
         return left.__lt__(right)
 
-    @binary_operation_handler
+    @quickened_operation_handler
     def _handle_cmp_ne(self, left: Value, right: Value):
         return left.__ne__(right)
 
@@ -191,6 +261,50 @@ class VirtualMachine:
         jump_address = instruction.first_arg
         self._context.perform_jump(jump_address)
 
+    def _create_comparison_jump_handler(self, comparison_type: OPCodeType, jump_result: bool) -> Callable:
+        compare_numbers = RAW_COMPARISONS[comparison_type]
+        compare_values = VALUE_COMPARISONS[comparison_type]
+
+        def handle_comparison_jump(instruction: OPCode):
+            right = self._pop_operand_value()
+            left = self._pop_operand_value()
+
+            if type(left) is NumberValue and type(right) is NumberValue:
+                comparison_result = compare_numbers(left.value, right.value)
+            else:
+                comparison_value = compare_values(left, right)
+
+                if not isinstance(comparison_value, BooleanValue):
+                    raise VirtualMachineInvalidInstructionError(
+                        "Impossible to perform conditional jump: comparison result is not boolean")
+
+                comparison_result = comparison_value.value
+
+            if comparison_result is jump_result:
+                self._context.perform_jump(instruction.first_arg)
+
+        return handle_comparison_jump
+
+    def _handle_forprep(self, instruction: OPCode):
+        step = self._pop_operand_value()
+        limit = self._pop_operand_value()
+        start = self._pop_operand_value()
+
+        counter = prepare_numeric_loop(self._context.current_call_context.locals, instruction.first_arg,
+                                       start, limit, step)
+
+        if counter is None:
+            self._context.perform_jump(instruction.second_arg)
+        else:
+            self._context.push_value(NumberValue.of(counter))
+
+    def _handle_forloop(self, instruction: OPCode):
+        counter = advance_numeric_loop(self._context.current_call_context.locals, instruction.first_arg)
+
+        if counter is not None:
+            self._context.push_value(NumberValue.of(counter))
+            self._context.perform_jump(instruction.second_arg)
+
     def _handle_boolean_not(self, instruction: OPCode):
         right = self._pop_operand_value()
 
@@ -204,7 +318,7 @@ class VirtualMachine:
     def _handle_declare_local(self, instruction: OPCode):
         value_identifier = instruction.first_arg
 
-        self._context.current_scope.set_local_value(value_identifier, NilValue())
+        self._context.current_scope.set_local_value(value_identifier, NIL)
 
     def _handle_assign(self, instruction: OPCode):
         value = self._pop_operand_value()
@@ -212,67 +326,83 @@ class VirtualMachine:
 
         self._context.current_scope.set_value(value_identifier, value)
 
+    def _handle_load_local(self, instruction: OPCode):
+        self._context.push_value(self._context.current_call_context.locals[instruction.first_arg])
+
+    def _handle_store_local(self, instruction: OPCode):
+        self._context.current_call_context.locals[instruction.first_arg] = self._pop_operand_value()
+
     def _handle_call(self, instruction: OPCode):
         callable_value = self._context.pop_value()
+        builtin_function = self._get_builtin_call_target(callable_value)
+
+        if builtin_function is not None:
+            self._call_builtin_function(builtin_function, instruction.first_arg)
 
-        if isinstance(callable_value, BuiltinFunctionValue):
-            args_count = instruction.first_arg
-            args = []
+            if instruction.second_arg != 1:
+                adjust_builtin_results(self._context.values_stack, instruction.second_arg)
+        else:
+            self._context.enter_to_call_context(callable_value, instruction.first_arg, instruction.second_arg)
 
-            for i in range(args_count):
-                arg = self._pop_operand_value()
-                args.append(arg)
+            if self._jit is not None:
+                self._jit.on_call(callable_value)
 
-            args = reversed(args)
+    def _handle_tail_call(self, instruction: OPCode):
+        callable_value = self._context.pop_value()
+        builtin_function = self._get_builtin_call_target(callable_value)
 
-            call_result = callable_value.call(*args)
-            assert isinstance(call_result, Value)
+        if builtin_function is not None:
+            # Builtin function does not use the frame, so its result is returned as usual
+            self._call_builtin_function(builtin_function, instruction.first_arg)
+            self._context.return_from_call_context(1)
 
-            self._context.push_value(call_result)
-        elif isinstance(callable_value, CustomFunctionValue):
-            self._context.enter_to_call_context(callable_value)
+            if self._jit is not None:
+                self._jit.on_return()
         else:
-            raise VirtualMachineInvalidInstructionError(
-                "Impossible to call value '{}': it is not callable".format(callable_value))
+            self._context.enter_to_tail_call_context(callable_value, instruction.first_arg)
+
+            if self._jit is not None:
+                self._jit.on_call(callable_value)
 
     def _handle_return(self, instruction: OPCode):
-        self._context.return_from_call_context()
+        self._context.return_from_call_context(instruction.first_arg)
 
-    def _handle_function(self, instruction: OPCode):
-        self._context.create_scope()
+        if self._jit is not None:
+            self._jit.on_return()
 
-        function_name = instruction.first_arg
-        function_value = CustomFunctionValue(function_name, self._context.instruction_address,
-                                             self._context.current_scope)
+    def _get_builtin_call_target(self, callable_value: Value) -> Optional[Callable]:
+        # Returns function of the builtin value or None for the custom function
+        cache = self._context.inline_caches[self._context.instruction_address - 1]
 
-        self._context.current_scope.set_value(function_name, function_value)
-        # skip instructions until function end
+        if callable_value is not cache.value:
+            if isinstance(callable_value, BuiltinFunctionValue):
+                cache.target = callable_value.function
+            elif isinstance(callable_value, CustomFunctionValue):
+                cache.target = None
+            else:
+                raise VirtualMachineInvalidInstructionError(
+                    "Impossible to call value '{}': it is not callable".format(callable_value))
 
-        if self._context.current_instruction.type != OPCodeType.BEGIN_SCOPE:
-            raise VirtualMachineInvalidInstructionError("'begin_scope' opcode must follow after function definition")
+            cache.value = callable_value
 
-        scopes_stack = [self._context.current_instruction.type]
+        return cache.target
 
-        while len(scopes_stack) > 0:
-            self._context.skip_instruction()
+    def _call_builtin_function(self, function: Callable, args_count: int):
+        values_stack = self._context.values_stack
 
-            current_instruction = self._context.current_instruction
+        get_builtin_caller(args_count)(function, values_stack, args_count)
+        assert isinstance(values_stack[-1], Value)
 
-            if current_instruction.type == OPCodeType.BEGIN_SCOPE:
-                scopes_stack.append(current_instruction.type)
-            elif current_instruction.type == OPCodeType.END_SCOPE:
-                ended_scope = scopes_stack.pop()
+    def _handle_declare_function(self, instruction: OPCode):
+        function_name = instruction.first_arg
+        function_value = CustomFunctionValue(function_name, self._context.instruction_address,
+                                             self._context.current_scope, instruction.second_arg,
+                                             instruction.fourth_arg)
 
-                if ended_scope != OPCodeType.BEGIN_SCOPE:
-                    raise VirtualMachineScopeOrderError(
-                        "Corresponding 'begin_scope' opcode is expected for `end_scope` "
-                        "but other 'end_scope' is reached")
-            else:
-                pass
+        self._context.current_scope.set_value(function_name, function_value)
 
-        # skip function 'end_scope' opcode
-        if not self._context.end_reached:
-            self._context.skip_instruction()
+        # skip function body including its 'end_scope' opcode
+        self._context.perform_jump(instruction.third_arg + 1)
 
     def _handle_begin_scope(self, instruction: OPCode):
         self._context.create_scope()
@@ -280,6 +410,40 @@ class VirtualMachine:
     def _handle_end_scope(self, instruction: OPCode):
         self._context.destroy_scope()
 
+    def _quicken_instruction(self, instruction: OPCode):
+        instruction_address = self._context.instruction_address - 1
+
+        if instruction_address not in self._despecialized_addresses:
+            quickened_type = QUICKENED_OPCODES[instruction.type]
+            self._context.code[instruction_address] = OPCode(quickened_type, instruction.args)
+
+    def _create_number_operation_handler(self, operation: Callable[[float, float], Value]) -> Callable:
+        values_stack = self._context.values_stack
+
+        def handle_number_operation(instruction: OPCode):
+            left = values_stack[-2]
+            right = values_stack[-1]
+
+            if type(left) is not NumberValue or type(right) is not NumberValue:
+                self._despecialize_instruction(instruction)
+                return
+
+            del values_stack[-2:]
+            values_stack.append(operation(left.value, right.value))
+
+        return handle_number_operation
+
+    def _despecialize_instruction(self, instruction: OPCode):
+        # Site has observed operands of other types, so it stays generic from now on
+        instruction_address = self._context.instruction_address - 1
+
+        generic_instruction = OPCode(GENERIC_OPCODES[instruction.type], instruction.args)
+
+        self._context.code[instruction_address] = generic_instruction
+        self._despecialized_addresses.add(instruction_address)
+
+        self._instructions_handlers[generic_instruction.type](generic_instruction)
+
     def _pop_operand_value(self) -> Value:
         value = self._context.pop_value()
 
@@ -287,6 +451,6 @@ class VirtualMachine:
             value = self._context.current_scope.get_value(value.value)
 
             if value is None:
-                value = NilValue()
+                value = NIL
 
         return value